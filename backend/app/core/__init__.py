@@ -1,4 +1,7 @@
 # backend/app/core/__init__.py
 
-from .config import settings
+from .config import settings, load_env
 from .cors import setup_cors
+from .compression import setup_compression
+from .limits import setup_request_limits
+from .logging_config import setup_logging
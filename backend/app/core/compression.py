@@ -0,0 +1,35 @@
+# backend/app/core/compression.py
+
+from fastapi import FastAPI
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+class NonStreamingGZipMiddleware:
+    """
+    GZipMiddleware that leaves Server-Sent Event streams untouched: gzip buffers
+    output until it has a full block, which would hold back SSE frames.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and _is_event_stream(scope):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip_app(scope, receive, send)
+
+def _is_event_stream(scope: Scope) -> bool:
+    if scope["path"].endswith("/stream"):
+        return True
+    for name, value in scope["headers"]:
+        if name == b"accept" and b"text/event-stream" in value:
+            return True
+    return False
+
+def setup_compression(app: FastAPI) -> None:
+    """
+    Gzip JSON responses of at least 1 KB, skipping SSE streams.
+    """
+    app.add_middleware(NonStreamingGZipMiddleware, minimum_size=1024)
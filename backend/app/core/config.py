@@ -1,9 +1,24 @@
 # backend/app/core/config.py
 
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl
 from typing import List, Optional
 
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """
+    Load backend/.env, then the project-root .env, into os.environ once per process.
+    Variables already set in the environment win, as does the first file to set one.
+    """
+    load_dotenv(_BACKEND_DIR / ".env")
+    load_dotenv(_BACKEND_DIR.parent / ".env")
+
 class Settings(BaseSettings):
     # API metadata
     PROJECT_NAME: str = "Brandos AI Platform API"
@@ -24,10 +39,22 @@ class Settings(BaseSettings):
 
     # OpenAI Configuration
     OPENAI_API_KEY: Optional[str] = None
+    # Maximum concurrent OpenAI calls per process, async endpoints and worker threads together
+    LLM_MAX_CONCURRENCY: int = 8
+    # Share of LLM_MAX_CONCURRENCY for the sync services running in worker threads
+    # (suggestions, costing, market research, scientific reasoning); unset means half
+    LLM_THREAD_CONCURRENCY: Optional[int] = None
+
+    # Level for the app.* loggers
+    LOG_LEVEL: str = "INFO"
+
+    # Request bodies larger than this are rejected with 413
+    MAX_REQUEST_BYTES: int = 10 * 1024 * 1024
 
     model_config = {
         "extra": "allow"
     }
 
 # instantiate for import
+load_env()
 settings = Settings()
@@ -0,0 +1,33 @@
+# backend/app/core/http.py
+
+import httpx
+from typing import Optional
+
+# Single pooled client for all outbound HTTP (OpenAI, Mailchimp) so keep-alive
+# connections and TLS sessions are reused across requests
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide AsyncClient, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=16, keepalive_expiry=30),
+            # Only a connect deadline: consumers with very different response times share
+            # this pool, so each sets its own read timeout (the OpenAI client 120s,
+            # Mailchimp calls 30s per request). A pool-wide read deadline would silently
+            # cap long LLM completions.
+            timeout=httpx.Timeout(None, connect=5.0),
+        )
+    return _http_client
+
+async def close_http_client() -> None:
+    """
+    Close the shared client on application shutdown.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,87 @@
+# backend/app/core/limits.py
+
+from typing import List
+
+from fastapi import FastAPI, HTTPException, params
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+class RequestBodyGuardMiddleware:
+    """
+    Rejects oversized request bodies, and non-JSON bodies sent to JSON routes.
+
+    A declared Content-Length over the limit, or a non-JSON body for a route that takes
+    a JSON body, is refused from the headers before any of it is read; form and
+    multipart routes, and anything unrouted, are left to FastAPI. Chunked bodies carry
+    no length, so the byte count is also enforced while the body streams in. Registered
+    inside CORSMiddleware so the rejections carry CORS headers like any other response.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, routes: List[BaseRoute]) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+        # The app's live route list, so routers included after setup are seen too
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await _reject(413, "Request body too large")(scope, receive, send)
+            return
+        has_body = (content_length not in (None, "0")) or "transfer-encoding" in headers
+        if (
+            scope["method"] in ("POST", "PUT", "PATCH")
+            and has_body
+            and not headers.get("content-type", "").startswith("application/json")
+            and _takes_json_body(self.routes, scope)
+        ):
+            await _reject(415, "Content-Type must be application/json")(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised from inside the route's body read, so FastAPI's exception
+                    # handling turns it into the 413 response
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+def _takes_json_body(routes: List[BaseRoute], scope: Scope) -> bool:
+    """
+    Whether the route this request will reach declares a JSON (non-form) body
+    """
+    # Only non-JSON bodies get here, so the extra route match stays off the common path
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return (
+                isinstance(route, APIRoute)
+                and route.body_field is not None
+                and not isinstance(route.body_field.field_info, params.Form)
+            )
+    return False
+
+def _reject(status_code: int, detail: str) -> ORJSONResponse:
+    return ORJSONResponse(status_code=status_code, content={"detail": detail})
+
+def setup_request_limits(app: FastAPI) -> None:
+    """
+    Enforce settings.MAX_REQUEST_BYTES, and JSON bodies on JSON routes. Call before setup_cors().
+    """
+    app.add_middleware(RequestBodyGuardMiddleware, max_bytes=settings.MAX_REQUEST_BYTES, routes=app.router.routes)
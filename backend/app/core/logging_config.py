@@ -0,0 +1,27 @@
+# backend/app/core/logging_config.py
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from .config import settings
+
+def setup_logging() -> None:
+    """
+    Send all app.* log records through a QueueHandler so request handlers never
+    block on stream writes; a background QueueListener does the actual I/O.
+    """
+    app_logger = logging.getLogger("app")
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in app_logger.handlers):
+        return  # already configured (e.g. on reload)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    app_logger.setLevel(settings.LOG_LEVEL)
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.propagate = False
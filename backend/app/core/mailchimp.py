@@ -1,7 +1,11 @@
 import hashlib
+import logging
 import httpx
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.http import get_http_client
+
+logger = logging.getLogger(__name__)
 
 class MailchimpClient:
     def __init__(self):
@@ -11,10 +15,13 @@ class MailchimpClient:
         self.base_url = f"https://{self.server_prefix}.api.mailchimp.com/3.0"
         
         # Debug logging
-        print(f"🔧 Mailchimp Config Debug:")
-        print(f"   API Key: {'✅ Set' if self.api_key else '❌ Missing'}")
-        print(f"   Server Prefix: {'✅ Set' if self.server_prefix else '❌ Missing'}")
-        print(f"   List ID: {'✅ Set' if self.list_id else '❌ Missing'}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "🔧 Mailchimp config: API Key %s, Server Prefix %s, List ID %s",
+                "✅ Set" if self.api_key else "❌ Missing",
+                "✅ Set" if self.server_prefix else "❌ Missing",
+                "✅ Set" if self.list_id else "❌ Missing",
+            )
         
     def _get_auth_header(self) -> Dict[str, str]:
         """Get the authorization header for Mailchimp API"""
@@ -53,32 +60,32 @@ class MailchimpClient:
         if merge_fields:
             payload["merge_fields"] = merge_fields
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.put(
-                    url,
-                    json=payload,
-                    headers=self._get_auth_header(),
-                    timeout=30.0
-                )
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 400:
-                    error_data = e.response.json()
-                    if "title" in error_data and "Member Exists" in error_data["title"]:
-                        # Member already exists, return success
-                        return {
-                            "id": subscriber_hash,
-                            "email_address": email,
-                            "status": "subscribed",
-                            "merge_fields": merge_fields or {}
-                        }
-                raise e
-            except Exception as e:
-                raise Exception(f"Failed to subscribe to Mailchimp: {str(e)}")
+        client = get_http_client()
+        try:
+            response = await client.put(
+                url,
+                json=payload,
+                headers=self._get_auth_header(),
+                timeout=30.0
+            )
+            
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 400:
+                error_data = e.response.json()
+                if "title" in error_data and "Member Exists" in error_data["title"]:
+                    # Member already exists, return success
+                    return {
+                        "id": subscriber_hash,
+                        "email_address": email,
+                        "status": "subscribed",
+                        "merge_fields": merge_fields or {}
+                    }
+            raise e
+        except Exception as e:
+            raise Exception(f"Failed to subscribe to Mailchimp: {str(e)}")
 
 # Create a singleton instance
 mailchimp_client = MailchimpClient() 
\ No newline at end of file
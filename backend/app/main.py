@@ -1,34 +1,64 @@
-import os
-from dotenv import load_dotenv
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
-
 # backend/app/main.py
 
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from app.core import settings, setup_cors
+from app.core import settings, setup_cors, setup_compression, setup_logging, setup_request_limits
+from app.core.http import get_http_client, close_http_client
+from app.services.openai_client import get_async_openai_client
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared connection pool and warm a TLS session to OpenAI before the first request
+    client = get_http_client()
+    if settings.OPENAI_API_KEY:
+        try:
+            await client.head("https://api.openai.com/v1", timeout=5.0)
+        except Exception as e:
+            logger.warning("OpenAI connection pre-warm failed: %s", e)
+    yield
+    # The cached AsyncOpenAI clients hold the pool closed below; drop them so a restarted
+    # app (or a test client re-entering the lifespan) builds new ones on a new pool
+    get_async_openai_client.cache_clear()
+    await close_http_client()
+    await cache_service.async_redis_client.aclose()
 
 # 1) instantiate your FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_prefix=settings.API_PREFIX,  # e.g. "/api" in the docs
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# 2) wire up CORS
+# 2) wire up request body limits, CORS, response compression and non-blocking logging.
+# Middleware added later wraps earlier middleware, so the body guard sits inside CORS
+# and its 413/415 responses still get CORS headers
+setup_request_limits(app)
 setup_cors(app)
+setup_compression(app)
+setup_logging()
+
+# Health check endpoint for Render; the body is constant, so encode it once
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "message": "Brandos AI Platform API is running"})
 
-# Health check endpoint for Render
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "Brandos AI Platform API is running"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 # 3) include all your routers under the same /api prefix
 from app.routers.query import router as query_router
 from app.routers.formulation import router as formulation_router
 from app.routers.costing import router as costing_router
 from app.routers.branding import router as branding_router
-from app.routers.query_router import router as query_suggestions_router
 from app.routers.mailchimp_router import router as mailchimp_router
 from app.routers.auth_router import router as auth_router
 from app.routers.scientific_reasoning import router as scientific_reasoning_router
@@ -40,7 +70,6 @@ app.include_router(query_router, prefix=settings.API_PREFIX + "/v1")
 app.include_router(formulation_router, prefix=settings.API_PREFIX + "/v1")
 app.include_router(costing_router, prefix=settings.API_PREFIX + "/v1")
 app.include_router(branding_router, prefix=settings.API_PREFIX + "/v1")
-app.include_router(query_suggestions_router, prefix=settings.API_PREFIX + "/v1")
 app.include_router(mailchimp_router, prefix=settings.API_PREFIX + "/v1")
 app.include_router(auth_router, prefix=settings.API_PREFIX + "/v1")
 app.include_router(scientific_reasoning_router, prefix=settings.API_PREFIX + "/v1")
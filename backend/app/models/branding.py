@@ -1,7 +1,10 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from .generate import GenerateResponse
 
+# Tones with pre-built brand name suggestions; brand_tone accepts any other string too
+BrandTone = Literal["modern", "traditional", "premium", "eco-friendly"]
+
 class BrandNameSuggestion(BaseModel):
     name: str
     meaning: str
@@ -29,7 +32,7 @@ class BrandingStrategy(BaseModel):
 class BrandingRequest(BaseModel):
     formulation: GenerateResponse
     target_audience: Optional[str] = "general"
-    brand_tone: Optional[str] = "modern"  # "modern", "traditional", "premium", "eco-friendly"
+    brand_tone: Optional[str] = "modern"  # usually one of BrandTone
     region: Optional[str] = "IN"
 
 class BrandingResponse(BaseModel):
@@ -15,22 +15,11 @@ class IngredientDetail(BaseModel):
     why_chosen: str
     suppliers: List[SupplierInfo]
 
-class Ingredient(BaseModel):
-    name: str
-    percent: float
-    cost_per_100ml: float
-    function: Optional[str] = None
-    safety_notes: Optional[str] = None
-
-class Formulation(BaseModel):
-    product_name: str
-    ingredients: List[Ingredient]
-    reasoning: str
-    estimated_cost: float
-    safety_notes: List[str]
-    instructions: Optional[str] = None
-    packaging: Optional[Dict[str, Any]] = None
-    marketing_inspiration: Optional[Dict[str, Any]] = None
+class GenerateRequest(BaseModel):
+    prompt: str
+    category: Optional[str] = None
+    target_cost: Optional[str] = None
+    detailed_steps: Optional[bool] = False  # Flag for detailed 6-7 step formulation
 
 class ScientificReasoning(BaseModel):
     keyComponents: List[Dict[str, str]]
@@ -65,12 +54,6 @@ class MarketResearch(BaseModel):
     tm: Dict[str, Any]
     detailed_calculations: Optional[Dict[str, MarketMetricDetail]] = None
 
-class GenerateRequest(BaseModel):
-    prompt: str
-    category: Optional[str] = None
-    target_cost: Optional[str] = None
-    detailed_steps: Optional[bool] = False  # Flag for detailed 6-7 step formulation
-
 class GenerateResponse(BaseModel):
     product_name: str
     reasoning: str
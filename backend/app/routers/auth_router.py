@@ -1,7 +1,10 @@
+import logging
 from fastapi import APIRouter, HTTPException
 from app.models.auth import AuthCheckRequest, AuthCheckResponse
 from app.services.mailchimp.auth_service import auth_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/check", response_model=AuthCheckResponse)
@@ -12,7 +15,7 @@ async def check_subscription(request: AuthCheckRequest):
         return AuthCheckResponse(subscribed=subscribed)
     except Exception as e:
         # Log the error for debugging
-        print(f"Error checking subscription for {request.email}: {str(e)}")
+        logger.error("Error checking subscription for %s: %s", request.email, e)
         raise HTTPException(
             status_code=502,
             detail="Unable to check subscription status. Please try again later."
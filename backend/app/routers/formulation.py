@@ -1,73 +1,173 @@
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Request, Response
+from sse_starlette.sse import EventSourceResponse
 from app.models.generate import GenerateRequest, GenerateResponse
-from app.services.generate.generate_service import generate_formulation
-import json
+from app.services.generate.generate_service import generate_real_formulation_async, generate_fallback_formulation
+import orjson
 import asyncio
+import hashlib
+import logging
 import time
-from typing import AsyncGenerator
+from collections import OrderedDict
+from typing import AsyncGenerator, Dict, Optional, Tuple
 
 router = APIRouter(prefix="/formulation", tags=["formulation"])
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long a request waits for a formulation. On timeout only the
+# awaiting coroutine gives up: the shared generation task is shielded so other
+# requests waiting on the same key still get its result.
+_GENERATION_TIMEOUT = 90
+
+# Personality-driven status messages shown while a formulation is generated
+STATUS_MESSAGES = [
+    {"status": "thinking", "message": "🤔 Hmm, let me think about this formulation...", "progress": 5},
+    {"status": "analyzing", "message": "🔍 Analyzing your requirements in detail...", "progress": 15},
+    {"status": "researching", "message": "📚 Researching the latest market trends...", "progress": 25},
+    {"status": "brainstorming", "message": "💡 Brainstorming innovative ingredient combinations...", "progress": 35},
+    {"status": "calculating", "message": "🧮 Calculating optimal ingredient percentages...", "progress": 45},
+    {"status": "validating", "message": "✅ Validating formulation against safety standards...", "progress": 55},
+    {"status": "optimizing", "message": "⚡ Optimizing for cost-effectiveness...", "progress": 65},
+    {"status": "sourcing", "message": "🏪 Finding the best suppliers for your ingredients...", "progress": 75},
+    {"status": "packaging", "message": "📦 Designing packaging and marketing strategies...", "progress": 85},
+    {"status": "finalizing", "message": "🎯 Finalizing your comprehensive formulation...", "progress": 95},
+]
+
+# The messages never change, so encode each SSE frame once at import
+_STATUS_FRAMES: list[bytes] = [b"data: " + orjson.dumps(m) + b"\n\n" for m in STATUS_MESSAGES]
+
+# The completion frame wraps the formulation JSON in a fixed envelope; splice the
+# pydantic-core serialized formulation between these instead of re-encoding it
+_COMPLETE_FRAME_PREFIX = b"data: " + orjson.dumps({
+    "status": "complete",
+    "message": "🎉 Your formulation is ready!",
+    "progress": 100,
+})[:-1] + b',"data":'
+_COMPLETE_FRAME_SUFFIX = b"}\n\n"
+
+# In-process memo of finished formulations keyed by request hash, plus the
+# generations currently running so identical concurrent requests share one call.
+# Entries are (expires_at, formulation, serialized body, ETag of that body).
+_CACHE_TTL = 300
+_CACHE_MAXSIZE = 256
+_formulation_cache: "OrderedDict[str, Tuple[float, GenerateResponse, bytes, str]]" = OrderedDict()
+_inflight: Dict[str, asyncio.Future] = {}
+
+def _request_key(request: GenerateRequest) -> str:
+    """Canonical hash of the request fields that determine the formulation"""
+    payload = orjson.dumps(request.model_dump(), option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def _memo_entry(formulation: GenerateResponse) -> Tuple[float, GenerateResponse, bytes, str]:
+    """Memo entry for a formulation; the ETag identifies the response body, not the request"""
+    body = formulation.model_dump_json().encode()
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    return time.monotonic() + _CACHE_TTL, formulation, body, etag
+
+def _cached_formulation(key: str) -> Optional[Tuple[float, GenerateResponse, bytes, str]]:
+    entry = _formulation_cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        del _formulation_cache[key]
+        return None
+    _formulation_cache.move_to_end(key)
+    return entry
+
+def _store_formulation(key: str, future: asyncio.Future) -> None:
+    _inflight.pop(key, None)
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        # Failed generations are never memoized; waiters serve the sample formulation
+        logger.warning("Formulation generation failed: %s", error)
+        return
+    _formulation_cache[key] = _memo_entry(future.result())
+    _formulation_cache.move_to_end(key)
+    while len(_formulation_cache) > _CACHE_MAXSIZE:
+        _formulation_cache.popitem(last=False)
+
+def _generation_for(key: str, request: GenerateRequest) -> asyncio.Future:
+    """Return the running generation for this key, starting one if none is in flight"""
+    generation = _inflight.get(key)
+    if generation is None:
+        generation = asyncio.ensure_future(generate_real_formulation_async(request))
+        generation.add_done_callback(lambda f: _store_formulation(key, f))
+        _inflight[key] = generation
+    return generation
+
 @router.post("/generate", response_model=GenerateResponse)
-async def generate_endpoint(request: GenerateRequest):
+async def generate_endpoint(request: GenerateRequest, http_request: Request):
     """Generate a formulation based on the request"""
+    key = _request_key(request)
+    entry = _cached_formulation(key)
+    if entry is not None and http_request.headers.get("if-none-match") == entry[3]:
+        # Client already holds exactly the formulation we would send
+        return Response(status_code=304, headers={"ETag": entry[3]})
+    
     try:
-        # Call the generate service
-        formulation = generate_formulation(request)
-        return formulation
-    except Exception as e:
-        # Return a mock formulation for now
-        return GenerateResponse(
-            product_name="Sample Product",
-            reasoning="This is a sample formulation generated for testing purposes.",
-            ingredients=[],
-            manufacturing_steps=[
-                "Step 1: Prepare equipment",
-                "Step 2: Mix ingredients",
-                "Step 3: Package product"
-            ],
-            estimated_cost=15.0,
-            safety_notes=["Test formulation", "For development only"],
-            packaging_marketing_inspiration="Sample packaging ideas",
-            market_trends=["Sample trend"],
-            competitive_landscape={"sample": "data"}
+        if entry is None:
+            # Await the async generate service; shield the shared
+            # generation so one waiter timing out doesn't cancel it for the others
+            formulation = await asyncio.wait_for(
+                asyncio.shield(_generation_for(key, request)),
+                timeout=_GENERATION_TIMEOUT
+            )
+            entry = _cached_formulation(key) or _memo_entry(formulation)
+        _, _, body, etag = entry
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": f"private, max-age={_CACHE_TTL}"}
+        )
+    except Exception:
+        # Generation failed or timed out: serve the sample formulation, uncached and without an ETag
+        fallback = generate_fallback_formulation(request)
+        return Response(
+            content=fallback.model_dump_json(),
+            media_type="application/json",
+            headers={"Cache-Control": "no-store"}
         )
 
 @router.post("/generate/stream")
 async def generate_formulation_stream(request: GenerateRequest):
     """Stream formulation generation with personality-driven status updates"""
     
-    async def generate_status_stream() -> AsyncGenerator[str, None]:
-        # Define personality-driven status messages
-        status_messages = [
-            {"status": "thinking", "message": "🤔 Hmm, let me think about this formulation...", "progress": 5},
-            {"status": "analyzing", "message": "🔍 Analyzing your requirements in detail...", "progress": 15},
-            {"status": "researching", "message": "📚 Researching the latest market trends...", "progress": 25},
-            {"status": "brainstorming", "message": "💡 Brainstorming innovative ingredient combinations...", "progress": 35},
-            {"status": "calculating", "message": "🧮 Calculating optimal ingredient percentages...", "progress": 45},
-            {"status": "validating", "message": "✅ Validating formulation against safety standards...", "progress": 55},
-            {"status": "optimizing", "message": "⚡ Optimizing for cost-effectiveness...", "progress": 65},
-            {"status": "sourcing", "message": "🏪 Finding the best suppliers for your ingredients...", "progress": 75},
-            {"status": "packaging", "message": "📦 Designing packaging and marketing strategies...", "progress": 85},
-            {"status": "finalizing", "message": "🎯 Finalizing your comprehensive formulation...", "progress": 95},
-        ]
+    async def generate_status_stream() -> AsyncGenerator[bytes, None]:
+        key = _request_key(request)
+        entry = _cached_formulation(key)
+        formulation = entry[1] if entry is not None else None
         
-        # Stream each status update
-        for status_update in status_messages:
-            yield f"data: {json.dumps(status_update)}\n\n"
-            await asyncio.sleep(1.5)  # Wait 1.5 seconds between updates
+        if formulation is None:
+            # Start the actual generation right away so it overlaps with the status frames
+            generation = _generation_for(key, request)
+            
+            # Stream each status update, stopping early once the formulation is ready
+            for frame in _STATUS_FRAMES:
+                yield frame
+                done, _ = await asyncio.wait({generation}, timeout=1.5)  # Up to 1.5 seconds between updates
+                if done:
+                    break
         
-        # Generate the actual formulation
         try:
-            formulation = generate_formulation(request)
-            final_response = {
-                "status": "complete",
-                "message": "🎉 Your formulation is ready!",
-                "progress": 100,
-                "data": formulation.dict()
+            if formulation is None:
+                try:
+                    formulation = await asyncio.wait_for(asyncio.shield(generation), timeout=_GENERATION_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise
+                except Exception:
+                    # Generation failed: stream the sample formulation (it is not memoized)
+                    formulation = generate_fallback_formulation(request)
+            yield _COMPLETE_FRAME_PREFIX + formulation.model_dump_json().encode() + _COMPLETE_FRAME_SUFFIX
+        except asyncio.TimeoutError:
+            error_response = {
+                "status": "error",
+                "message": "⏳ Formulation generation is taking too long, please try again.",
+                "progress": 0,
+                "error": f"Generation timed out after {_GENERATION_TIMEOUT} seconds"
             }
-            yield f"data: {json.dumps(final_response)}\n\n"
+            yield b"data: " + orjson.dumps(error_response) + b"\n\n"
         except Exception as e:
             error_response = {
                 "status": "error",
@@ -75,14 +175,14 @@ async def generate_formulation_stream(request: GenerateRequest):
                 "progress": 0,
                 "error": str(e)
             }
-            yield f"data: {json.dumps(error_response)}\n\n"
+            yield b"data: " + orjson.dumps(error_response) + b"\n\n"
     
-    return StreamingResponse(
+    # EventSourceResponse sets the no-cache/keep-alive/X-Accel-Buffering headers and sends
+    # keep-alive pings so proxies don't drop the connection during a long generation
+    return EventSourceResponse(
         generate_status_stream(),
-        media_type="text/event-stream",
+        ping=15,
         headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
             "Access-Control-Allow-Headers": "Content-Type",
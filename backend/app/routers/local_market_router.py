@@ -1,13 +1,33 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from typing import List, Optional
+from functools import lru_cache
 import logging
+import orjson
 from ..services.local_market_size_service import LocalMarketSizeService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/local-market", tags=["Local Market Analysis"])
 
+@lru_cache(maxsize=1)
+def _market_service() -> LocalMarketSizeService:
+    """Shared LocalMarketSizeService; its lookup tables are built once per process"""
+    return LocalMarketSizeService()
+
+# /cities and /categories are static for the life of the process
+_STATIC_HEADERS = {"Cache-Control": "public, max-age=3600"}
+
+@lru_cache(maxsize=1)
+def _cities_payload() -> bytes:
+    cities = list(_market_service().city_populations.keys())
+    return orjson.dumps({"success": True, "cities": cities, "total_cities": len(cities)})
+
+@lru_cache(maxsize=1)
+def _categories_payload() -> bytes:
+    categories = list(_market_service().category_config.keys())
+    return orjson.dumps({"success": True, "categories": categories, "total_categories": len(categories)})
+
 class LocalMarketRequest(BaseModel):
     location: str
     category: str
@@ -27,7 +47,7 @@ async def analyze_local_market_size(request: LocalMarketRequest):
     """
     try:
         logger.info(f"Starting local market analysis for {request.location} in {request.category} category")
-        market_service = LocalMarketSizeService()
+        market_service = _market_service()
         # Ensure product_name is a string and ingredients is a list
         product_name = request.product_name if request.product_name is not None else ""
         ingredients = request.ingredients if request.ingredients is not None else []
@@ -57,14 +77,7 @@ async def get_available_cities():
     Get list of available cities for local market analysis.
     """
     try:
-        market_service = LocalMarketSizeService()
-        cities = list(market_service.city_populations.keys())
-        
-        return {
-            "success": True,
-            "cities": cities,
-            "total_cities": len(cities)
-        }
+        return Response(content=_cities_payload(), media_type="application/json", headers=_STATIC_HEADERS)
         
     except Exception as e:
         logger.error(f"Error getting available cities: {str(e)}")
@@ -79,13 +92,7 @@ async def get_available_categories():
     Get list of available categories for local market analysis.
     """
     try:
-        market_service = LocalMarketSizeService()
-        categories = list(market_service.category_config.keys())
-        return {
-            "success": True,
-            "categories": categories,
-            "total_categories": len(categories)
-        }
+        return Response(content=_categories_payload(), media_type="application/json", headers=_STATIC_HEADERS)
     except Exception as e:
         logger.error(f"Error getting available categories: {str(e)}")
         raise HTTPException(
@@ -1,13 +1,20 @@
 """
 FastAPI router for market research analysis
 """
+import asyncio
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List, Optional
+from functools import lru_cache
 from app.services.market_research_service import MarketResearchService
 
 router = APIRouter(prefix="/market-research", tags=["market-research"])
 
+@lru_cache(maxsize=1)
+def _market_research_service() -> MarketResearchService:
+    """Shared MarketResearchService so the OpenAI client is created once per process"""
+    return MarketResearchService()
+
 class MarketSizeRequest(BaseModel):
     product_name: str
     category: str
@@ -34,8 +41,10 @@ class MarketSizeResponse(BaseModel):
 async def get_current_market_size(request: MarketSizeRequest):
     """Get current market size specifically for the product the user wants to build"""
     try:
-        service = MarketResearchService()
-        market_data = service.get_current_market_size(
+        service = _market_research_service()
+        # The lookup and OpenAI call are blocking; keep them off the event loop
+        market_data = await asyncio.to_thread(
+            service.get_current_market_size,
             request.product_name,
             request.category,
             request.ingredients
@@ -3,11 +3,13 @@ Phase 2 Optimization Router
 Provides endpoints for advanced optimization features.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, Optional
+import time
+import orjson
+from fastapi import APIRouter, HTTPException, Response
+from typing import Dict, Any, Optional, List, Tuple
 from pydantic import BaseModel
 from app.services.cache_service import cache_service
-from app.services.adaptive_prompt_service import prompt_optimizer
+from app.services.adaptive_prompt_service import prompt_optimizer, PromptType, PromptContext
 from app.utils.advanced_compression import compress_api_response, CompressionLevel
 
 router = APIRouter(prefix="/optimization", tags=["optimization"])
@@ -78,7 +80,7 @@ async def invalidate_cache_pattern(pattern: str) -> Dict[str, Any]:
     Invalidate cache entries matching pattern
     """
     try:
-        deleted_count = cache_service.invalidate_pattern(pattern)
+        deleted_count = await cache_service.ainvalidate_pattern(pattern)
         return {
             "message": f"Invalidated {deleted_count} cache entries",
             "pattern": pattern,
@@ -87,17 +89,28 @@ async def invalidate_cache_pattern(pattern: str) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to invalidate cache: {str(e)}")
 
+async def _scan_cache_keys(match: str, sample_size: int = 10) -> Tuple[int, List[str]]:
+    """
+    Count keys with incremental SCAN batches instead of a blocking KEYS call
+    """
+    total = 0
+    sample = []
+    async for key in cache_service.async_redis_client.scan_iter(match=match, count=500):
+        total += 1
+        if len(sample) < sample_size:  # Limit to first 10 for security
+            sample.append(key.decode("utf-8", "backslashreplace"))
+    return total, sample
+
 @router.get("/cache/keys")
 async def get_cache_keys() -> Dict[str, Any]:
     """
     Get all cache keys (for debugging)
     """
     try:
-        # This is a simplified version - in production you'd want more sophisticated key management
-        keys = cache_service.redis_client.keys("brandos:*")
+        total_keys, sample = await _scan_cache_keys("brandos:*")
         return {
-            "total_keys": len(keys),
-            "keys": keys[:10]  # Limit to first 10 for security
+            "total_keys": total_keys,
+            "keys": sample
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get cache keys: {str(e)}")
@@ -108,8 +121,6 @@ async def optimize_prompt(prompt: str, prompt_type: str, context: Optional[Dict[
     Optimize a prompt using adaptive techniques
     """
     try:
-        from app.services.adaptive_prompt_service import PromptType, PromptContext
-        
         # Convert string to enum
         prompt_type_enum = PromptType(prompt_type)
         
@@ -130,28 +141,37 @@ async def optimize_prompt(prompt: str, prompt_type: str, context: Optional[Dict[
             "optimized_prompt": optimized.prompt,
             "token_count": optimized.token_count,
             "confidence_score": optimized.confidence_score,
-            "techniques_used": optimized.optimization_techniques
+            "techniques_used": list(optimized.optimization_techniques)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prompt optimization failed: {str(e)}")
 
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "cache": "connected",
+    "prompt_optimizer": "working",
+    "compression": "available"
+})
+_HEALTH_TTL = 2.0  # seconds a successful probe is reused by frequent load-balancer polls
+_last_healthy_at = 0.0
+
 @router.get("/health")
-async def optimization_health() -> Dict[str, str]:
+async def optimization_health() -> Response:
     """
     Health check for optimization services
     """
+    global _last_healthy_at
+    if time.monotonic() - _last_healthy_at < _HEALTH_TTL:
+        return Response(content=_HEALTH_BODY, media_type="application/json")
+    
     try:
         # Test cache connection
-        cache_service.redis_client.ping()
+        await cache_service.async_redis_client.ping()
         
         # Test prompt optimizer
         test_prompt = prompt_optimizer.create_formulation_prompt("test", product_type="cosmetics")
         
-        return {
-            "status": "healthy",
-            "cache": "connected",
-            "prompt_optimizer": "working",
-            "compression": "available"
-        }
+        _last_healthy_at = time.monotonic()
+        return Response(content=_HEALTH_BODY, media_type="application/json")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Optimization services unhealthy: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Optimization services unhealthy: {str(e)}")
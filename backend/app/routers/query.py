@@ -1,48 +1,64 @@
 """
 FastAPI router for query assessment
 """
-from fastapi import APIRouter
+import re
+import asyncio
+from fastapi import APIRouter, Response
+from pydantic import BaseModel
 from app.models.assess import AssessRequest, AssessResponse
 from app.models.query import SuggestionRequest, SuggestionResponse
 from app.services.query.suggestions_service import generate_suggestions
 
 router = APIRouter(prefix="/query", tags=["query"])
 
+def _keyword_pattern(*words: str) -> re.Pattern:
+    """One compiled alternation matching any of the words anywhere in the text"""
+    return re.compile("|".join(map(re.escape, words)))
+
+# Keyword patterns for assess_query_quality_simple, built once per process. They match
+# substrings, so "acne-prone", "serums" and "skincare" count like "acne", "serum" and "skin"
+_PRODUCT_WORDS = _keyword_pattern('serum', 'cream', 'gel', 'lotion', 'moisturizer')
+_AREA_WORDS = _keyword_pattern('skin', 'face', 'body', 'hair')
+_CONCERN_WORDS = _keyword_pattern('acne', 'aging', 'hydration', 'brightening', 'anti-aging')
+
+_ASSESS_SUGGESTIONS = [
+    "Specify the type of product (serum, cream, gel, lotion, etc.)",
+    "Mention your target skin type or concern (oily, dry, sensitive, acne-prone, etc.)",
+    "Include any ingredient preferences or restrictions (natural, vegan, fragrance-free, etc.)",
+    "Describe the desired texture or performance (lightweight, rich, fast-absorbing, etc.)",
+    "Add your target audience (age group, skin concerns, lifestyle)"
+]
+_SECOND_IMPROVEMENT_EXAMPLE = "Or: 'Create a rich anti-aging night cream for mature, dry skin with retinol and hyaluronic acid, suitable for sensitive skin'"
+
+def _json_response(model: BaseModel) -> Response:
+    """Serialize an already-validated model directly, skipping FastAPI's response_model re-validation"""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
 def assess_query_quality_simple(query: str, category: str | None = None):
     """Simple query quality assessment"""
     if not query:
         query = ""
     
+    # One regex scan per keyword group instead of a substring scan per keyword
     query_lower = query.lower()
-    score = 3
-    
-    if len(query.split()) > 10:
-        score += 1
-    if any(word in query_lower for word in ['serum', 'cream', 'gel', 'lotion', 'moisturizer']):
-        score += 1
-    if any(word in query_lower for word in ['skin', 'face', 'body', 'hair']):
-        score += 1
-    if any(word in query_lower for word in ['acne', 'aging', 'hydration', 'brightening', 'anti-aging']):
-        score += 1
+    score = (
+        3
+        + (len(query.split()) > 10)
+        + bool(_PRODUCT_WORDS.search(query_lower))
+        + bool(_AREA_WORDS.search(query_lower))
+        + bool(_CONCERN_WORDS.search(query_lower))
+    )
     
     needs_improvement = score < 5
     
-    suggestions = [
-        "Specify the type of product (serum, cream, gel, lotion, etc.)",
-        "Mention your target skin type or concern (oily, dry, sensitive, acne-prone, etc.)",
-        "Include any ingredient preferences or restrictions (natural, vegan, fragrance-free, etc.)",
-        "Describe the desired texture or performance (lightweight, rich, fast-absorbing, etc.)",
-        "Add your target audience (age group, skin concerns, lifestyle)"
-    ]
-    
     return {
         "score": score,
         "feedback": f"Query scored {score}/7. {'Needs improvement' if needs_improvement else 'Good quality'}. We can still generate a formulation, but more details would help create a more targeted product.",
         "needs_improvement": needs_improvement,
-        "suggestions": suggestions,
+        "suggestions": _ASSESS_SUGGESTIONS,
         "improvement_examples": [
             f"Instead of '{query}', try: 'I need a lightweight serum for oily, acne-prone skin that contains salicylic acid and niacinamide for blemish control'",
-            f"Or: 'Create a rich anti-aging night cream for mature, dry skin with retinol and hyaluronic acid, suitable for sensitive skin'"
+            _SECOND_IMPROVEMENT_EXAMPLE
         ],
         "missing_elements": [],
         "confidence_level": "medium" if score >= 4 else "low",
@@ -56,7 +72,7 @@ async def assess_query(request: AssessRequest):
     try:
         result = assess_query_quality_simple(request.prompt, request.category)
         
-        return AssessResponse(
+        response = AssessResponse(
             score=result["score"] / 7.0,  # Normalize to 0-1
             can_generate=result["can_generate_formulation"],
             feedback=result["feedback"],
@@ -64,12 +80,16 @@ async def assess_query(request: AssessRequest):
         )
     
     except Exception as e:
-        return AssessResponse(
+        response = AssessResponse(
             score=0.0,
             can_generate=False,
             feedback=f"Error assessing query: {str(e)}"
         )
+    
+    return _json_response(response)
 
 @router.post("/suggestions", response_model=SuggestionResponse)
 async def suggestions(request: SuggestionRequest):
-    return generate_suggestions(request) 
\ No newline at end of file
+    # generate_suggestions makes blocking OpenAI calls; keep them off the event loop
+    response = await asyncio.to_thread(generate_suggestions, request)
+    return _json_response(response) 
\ No newline at end of file
@@ -1,18 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from app.models.scientific_reasoning import ScientificReasoningRequest, ScientificReasoningResponse
 from app.services.scientific_reasoning_service import ScientificReasoningService
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["scientific-reasoning"])
 
+# One service (and OpenAI client) shared by every request
+_service = ScientificReasoningService()
+
 # Dependency to get the service
 def get_scientific_reasoning_service():
-    return ScientificReasoningService()
+    return _service
 
 @router.post("/scientific-reasoning/", response_model=ScientificReasoningResponse)
-def generate_scientific_reasoning(
+async def generate_scientific_reasoning(
     request: ScientificReasoningRequest,
     service: ScientificReasoningService = Depends(get_scientific_reasoning_service)
 ) -> ScientificReasoningResponse:
@@ -37,7 +41,7 @@ def generate_scientific_reasoning(
         logger.info(f"Generating scientific reasoning for category: {request.category}")
         
         # Generate scientific reasoning data
-        scientific_data = service.generate_scientific_reasoning(request)
+        scientific_data = await service.agenerate_scientific_reasoning(request)
         
         logger.info("Scientific reasoning generated successfully")
         return scientific_data
@@ -49,7 +53,9 @@ def generate_scientific_reasoning(
             detail=f"Failed to generate scientific reasoning: {str(e)}"
         )
 
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "scientific-reasoning"})
+
 @router.get("/scientific-reasoning/health")
-def health_check():
+async def health_check():
     """Health check endpoint for scientific reasoning service"""
-    return {"status": "healthy", "service": "scientific-reasoning"} 
\ No newline at end of file
+    return Response(content=_HEALTH_BODY, media_type="application/json") 
\ No newline at end of file
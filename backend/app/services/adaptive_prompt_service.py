@@ -3,15 +3,38 @@ Adaptive Prompt Service for Phase 2 Optimization
 Dynamically optimizes prompts based on context and usage patterns.
 """
 
-import json
-import hashlib
-from typing import Dict, List, Any, Optional
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on memoized prompts per service instance
+_PROMPT_CACHE_MAXSIZE = 1024
+
+# Shared empty default for PromptOptimizer contexts without requirements
+_NO_REQUIREMENTS: Tuple[str, ...] = ()
+
+# Aggressive-mode scrubbing: redundant words are dropped and common phrases shortened
+# in one pass of a single compiled alternation
+_SCRUB_REPLACEMENTS = {
+    "comprehensive": "",
+    "detailed": "",
+    "thorough": "",
+    "extensive": "",
+    "including": "with",
+    "consisting of": "with",
+    "comprising": "with",
+    "targeting": "for",
+    "focusing on": "for"
+}
+_SCRUB_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, _SCRUB_REPLACEMENTS)) + r")\b")
+
 class PromptType(Enum):
     FORMULATION = "formulation"
     MARKET_RESEARCH = "market_research"
@@ -24,21 +47,22 @@ class OptimizationLevel(Enum):
     MEDIUM = "medium"
     AGGRESSIVE = "aggressive"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PromptContext:
     query: str
     product_type: Optional[str] = None
     category: Optional[str] = None
-    requirements: Optional[List[str]] = None
+    requirements: Optional[Sequence[str]] = None
     constraints: Optional[List[str]] = None
     target_audience: Optional[str] = None
     region: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OptimizedPrompt:
     prompt: str
     token_count: int
-    optimization_techniques: List[str]
+    # A tuple, since memoized instances are shared between callers
+    optimization_techniques: Tuple[str, ...]
     confidence_score: float
 
 class AdaptivePromptService:
@@ -46,47 +70,87 @@ class AdaptivePromptService:
     Service for adaptive prompt optimization
     """
     
+    # Optimized prompt templates, shared read-only by every instance
+    _PROMPT_TEMPLATES = MappingProxyType({
+        PromptType.FORMULATION: MappingProxyType({
+            "base": "Create {product_type} formulation with {key_requirements}",
+            "detailed": "Develop comprehensive {product_type} formulation including ingredients, percentages, and manufacturing steps. Focus on {key_requirements}",
+            "minimal": "Formulate {product_type} with {key_requirements}"
+        }),
+        PromptType.MARKET_RESEARCH: MappingProxyType({
+            "base": "Analyze market for {product_type} in {region}",
+            "detailed": "Conduct comprehensive market research for {product_type} including TAM, SAM, TM analysis, competitive landscape, and growth projections in {region}",
+            "minimal": "Market analysis for {product_type}"
+        }),
+        PromptType.BRANDING: MappingProxyType({
+            "base": "Create branding strategy for {product_type} targeting {audience}",
+            "detailed": "Develop comprehensive branding strategy including brand name suggestions, visual identity, social media strategy, and marketing messaging for {product_type} targeting {audience}",
+            "minimal": "Brand strategy for {product_type}"
+        }),
+        PromptType.COSTING: MappingProxyType({
+            "base": "Calculate costs for {product_type} at {scale} scale",
+            "detailed": "Provide detailed cost analysis including CAPEX, OPEX, margins, and pricing strategy for {product_type} at {scale} scale in {region}",
+            "minimal": "Cost analysis for {product_type}"
+        }),
+        PromptType.SCIENTIFIC: MappingProxyType({
+            "base": "Analyze scientific basis for {product_type}",
+            "detailed": "Conduct comprehensive scientific analysis including ingredient rationale, consumer psychology, regulatory compliance, and safety assessment for {product_type}",
+            "minimal": "Scientific analysis for {product_type}"
+        })
+    })
+    
     def __init__(self, optimization_level: OptimizationLevel = OptimizationLevel.MEDIUM):
         self.optimization_level = optimization_level
-        self.prompt_templates = self._load_prompt_templates()
-        self.usage_patterns = {}
+        self.prompt_templates = self._PROMPT_TEMPLATES
+        self.usage_patterns = Counter()
         self.success_metrics = {}
+        # LRU memo of built prompts; sync services call in from worker threads, hence the lock
+        self._prompt_cache: "OrderedDict[tuple, OptimizedPrompt]" = OrderedDict()
+        self._prompt_cache_lock = threading.Lock()
         
-    def _load_prompt_templates(self) -> Dict:
+    def optimize_prompt(self, prompt_type: PromptType, context: PromptContext) -> OptimizedPrompt:
         """
-        Load optimized prompt templates
+        Optimize prompt based on context and usage patterns
         """
-        return {
-            PromptType.FORMULATION: {
-                "base": "Create {product_type} formulation with {key_requirements}",
-                "detailed": "Develop comprehensive {product_type} formulation including ingredients, percentages, and manufacturing steps. Focus on {key_requirements}",
-                "minimal": "Formulate {product_type} with {key_requirements}"
-            },
-            PromptType.MARKET_RESEARCH: {
-                "base": "Analyze market for {product_type} in {region}",
-                "detailed": "Conduct comprehensive market research for {product_type} including TAM, SAM, TM analysis, competitive landscape, and growth projections in {region}",
-                "minimal": "Market analysis for {product_type}"
-            },
-            PromptType.BRANDING: {
-                "base": "Create branding strategy for {product_type} targeting {audience}",
-                "detailed": "Develop comprehensive branding strategy including brand name suggestions, visual identity, social media strategy, and marketing messaging for {product_type} targeting {audience}",
-                "minimal": "Brand strategy for {product_type}"
-            },
-            PromptType.COSTING: {
-                "base": "Calculate costs for {product_type} at {scale} scale",
-                "detailed": "Provide detailed cost analysis including CAPEX, OPEX, margins, and pricing strategy for {product_type} at {scale} scale in {region}",
-                "minimal": "Cost analysis for {product_type}"
-            },
-            PromptType.SCIENTIFIC: {
-                "base": "Analyze scientific basis for {product_type}",
-                "detailed": "Conduct comprehensive scientific analysis including ingredient rationale, consumer psychology, regulatory compliance, and safety assessment for {product_type}",
-                "minimal": "Scientific analysis for {product_type}"
-            }
-        }
+        # The result is a pure function of these inputs, so repeat contexts skip the rebuild
+        cache_key = (prompt_type, self.optimization_level, self._context_key(context))
+        try:
+            with self._prompt_cache_lock:
+                optimized = self._prompt_cache.get(cache_key)
+                if optimized is not None:
+                    self._prompt_cache.move_to_end(cache_key)
+        except TypeError:
+            # Unhashable requirement values (e.g. nested JSON) are built without caching
+            cache_key = None
+            optimized = None
+        if optimized is None:
+            optimized = self._build_optimized_prompt(prompt_type, context)
+            if cache_key is not None:
+                with self._prompt_cache_lock:
+                    self._prompt_cache[cache_key] = optimized
+                    if len(self._prompt_cache) > _PROMPT_CACHE_MAXSIZE:
+                        self._prompt_cache.popitem(last=False)
+        
+        # Track usage
+        self._track_usage(prompt_type, context)
+        
+        return optimized
     
-    def optimize_prompt(self, prompt_type: PromptType, context: PromptContext) -> OptimizedPrompt:
+    def _context_key(self, context: PromptContext) -> tuple:
         """
-        Optimize prompt based on context and usage patterns
+        Hashable key of the context fields that affect the built prompt
+        """
+        return (
+            context.product_type,
+            context.category,
+            tuple(context.requirements) if context.requirements else (),
+            context.target_audience,
+            context.region,
+        )
+    
+    def _build_optimized_prompt(self, prompt_type: PromptType, context: PromptContext) -> OptimizedPrompt:
+        """
+        Fill, optimize and score the template for a context
         """
         # Determine template level based on optimization level
         template_level = self._get_template_level()
@@ -98,16 +162,12 @@ class AdaptivePromptService:
         filled_prompt = self._fill_template(template, context)
         
         # Apply additional optimizations
-        optimized_prompt = self._apply_optimizations(filled_prompt, context)
+        optimized_prompt, token_count = self._apply_optimizations(filled_prompt, context)
         
         # Calculate metrics
-        token_count = len(optimized_prompt.split())
         confidence_score = self._calculate_confidence(context)
         techniques = self._get_optimization_techniques()
         
-        # Track usage
-        self._track_usage(prompt_type, context)
-        
         return OptimizedPrompt(
             prompt=optimized_prompt,
             token_count=token_count,
@@ -144,40 +204,23 @@ class AdaptivePromptService:
             "category": context.category or "cosmetics"
         }
         
-        # Fill template
-        filled = template
-        for key, value in context_map.items():
-            filled = filled.replace(f"{{{key}}}", str(value))
-        
-        return filled
+        # Fill template in a single pass; unknown placeholders become empty
+        return template.format_map(defaultdict(str, context_map))
     
-    def _apply_optimizations(self, prompt: str, context: PromptContext) -> str:
+    def _apply_optimizations(self, prompt: str, context: PromptContext) -> Tuple[str, int]:
         """
-        Apply additional optimizations based on level
+        Apply additional optimizations based on level; returns the prompt and its word count
         """
         optimized = prompt
         
         if self.optimization_level == OptimizationLevel.AGGRESSIVE:
-            # Remove redundant words
-            redundant_words = ["comprehensive", "detailed", "thorough", "extensive"]
-            for word in redundant_words:
-                optimized = optimized.replace(word, "")
-            
-            # Shorten common phrases
-            phrase_replacements = {
-                "including": "with",
-                "consisting of": "with",
-                "comprising": "with",
-                "targeting": "for",
-                "focusing on": "for"
-            }
-            for old, new in phrase_replacements.items():
-                optimized = optimized.replace(old, new)
+            # Remove redundant words and shorten common phrases
+            optimized = _SCRUB_RE.sub(lambda m: _SCRUB_REPLACEMENTS[m.group(0)], optimized)
         
-        # Remove excessive whitespace
-        optimized = " ".join(optimized.split())
+        # Remove excessive whitespace, reusing the split for the token count
+        words = optimized.split()
         
-        return optimized
+        return " ".join(words), len(words)
     
     def _calculate_confidence(self, context: PromptContext) -> float:
         """
@@ -196,14 +239,14 @@ class AdaptivePromptService:
         
         return min(score, 1.0)
     
-    def _get_optimization_techniques(self) -> List[str]:
+    def _get_optimization_techniques(self) -> Tuple[str, ...]:
         """
-        Get list of optimization techniques used
+        Get the optimization techniques used
         """
-        techniques = ["template_optimization", "context_filling"]
+        techniques = ("template_optimization", "context_filling")
         
         if self.optimization_level == OptimizationLevel.AGGRESSIVE:
-            techniques.extend(["redundant_word_removal", "phrase_shortening"])
+            techniques += ("redundant_word_removal", "phrase_shortening")
         
         return techniques
     
@@ -211,10 +254,7 @@ class AdaptivePromptService:
         """
         Track usage patterns for adaptive optimization
         """
-        key = f"{prompt_type.value}_{context.product_type}"
-        if key not in self.usage_patterns:
-            self.usage_patterns[key] = 0
-        self.usage_patterns[key] += 1
+        self.usage_patterns[f"{prompt_type.value}_{context.product_type}"] += 1
     
     def get_optimization_stats(self) -> Dict:
         """
@@ -242,7 +282,7 @@ class PromptOptimizer:
             query=query,
             product_type=kwargs.get("product_type"),
             category=kwargs.get("category"),
-            requirements=kwargs.get("requirements", []),
+            requirements=kwargs.get("requirements") or _NO_REQUIREMENTS,
             region=kwargs.get("region", "India")
         )
         
@@ -1,333 +1,340 @@
-from app.models.branding import BrandingStrategy, BrandNameSuggestion, SocialMediaChannel, BrandingRequest
+from app.models.branding import BrandingStrategy, BrandNameSuggestion, SocialMediaChannel, BrandingRequest, BrandTone
 from app.models.generate import GenerateResponse
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, get_args
+import logging
+from functools import lru_cache
 
-def generate_brand_name_suggestions(formulation: GenerateResponse, brand_tone: str) -> List[BrandNameSuggestion]:
-    """
-    Generate brand name suggestions based on the formulation and brand tone.
-    """
-    product_name = formulation["product_name"] if isinstance(formulation, dict) else formulation.product_name
-    if isinstance(formulation, dict):
-        category = formulation.get('category', 'general')
-    else:
-        category = getattr(formulation, 'category', 'general')
-    
-    # Debug: Print category detection
-    print(f"DEBUG: Detected category: '{category}' from formulation")
-    print(f"DEBUG: Formulation keys: {formulation.keys() if isinstance(formulation, dict) else (formulation.__dict__.keys() if hasattr(formulation, '__dict__') else 'No __dict__')}")
-    
-    # Brand name suggestions based on category and tone
-    suggestions = []
-    
-    if category == "pet food":
-        suggestions = [
-            BrandNameSuggestion(
-                name="Pawsome",
-                meaning="Combination of 'Paws' and 'Awesome'",
-                category=brand_tone,
-                reasoning="Perfect for pet food as it's playful and memorable",
-                availability_check="High availability for trademark registration"
-            ),
-            BrandNameSuggestion(
-                name="NutriPaws",
-                meaning="Nutrition + Paws",
-                category=brand_tone,
-                reasoning="Emphasizes nutrition and pet care",
-                availability_check="Good availability, descriptive but distinctive"
-            ),
-            BrandNameSuggestion(
-                name="VitalBites",
-                meaning="Vital nutrition in bite-sized portions",
-                category=brand_tone,
-                reasoning="Suggests health and nutrition benefits",
-                availability_check="Moderate availability, health-focused"
-            )
-        ]
-    elif category == "wellness":
-        suggestions = [
-            BrandNameSuggestion(
-                name="VitaFlow",
-                meaning="Vitality + Flow of wellness",
-                category=brand_tone,
-                reasoning="Suggests natural flow of wellness and vitality",
-                availability_check="Good availability, wellness-focused"
-            ),
-            BrandNameSuggestion(
-                name="PureEssence",
-                meaning="Pure essence of natural ingredients",
-                category=brand_tone,
-                reasoning="Emphasizes purity and natural ingredients",
-                availability_check="Moderate availability, premium positioning"
-            ),
-            BrandNameSuggestion(
-                name="WellCore",
-                meaning="Core of wellness",
-                category=brand_tone,
-                reasoning="Suggests fundamental wellness benefits",
-                availability_check="High availability, modern and clean"
-            )
-        ]
-    elif category == "cosmetics":
-        suggestions = [
-            BrandNameSuggestion(
-                name="GlowCraft",
-                meaning="Crafting natural glow",
-                category=brand_tone,
-                reasoning="Suggests artisanal approach to beauty",
-                availability_check="Good availability, beauty-focused"
-            ),
-            BrandNameSuggestion(
-                name="PureGlow",
-                meaning="Pure natural glow",
-                category=brand_tone,
-                reasoning="Emphasizes natural beauty and radiance",
-                availability_check="Moderate availability, clean beauty"
-            ),
-            BrandNameSuggestion(
-                name="VitaBeauty",
-                meaning="Vitality + Beauty",
-                category=brand_tone,
-                reasoning="Combines health and beauty benefits",
-                availability_check="High availability, wellness-beauty crossover"
-            )
-        ]
-    else:
-        # Generic suggestions
-        suggestions = [
-            BrandNameSuggestion(
-                name="VitaCraft",
-                meaning="Crafting vitality",
-                category=brand_tone,
-                reasoning="Suggests artisanal approach to health",
-                availability_check="Good availability, versatile"
-            ),
-            BrandNameSuggestion(
-                name="PureEssence",
-                meaning="Pure essence of natural ingredients",
-                category=brand_tone,
-                reasoning="Emphasizes purity and natural ingredients",
-                availability_check="Moderate availability, premium positioning"
-            ),
-            BrandNameSuggestion(
-                name="WellCraft",
-                meaning="Crafting wellness",
-                category=brand_tone,
-                reasoning="Suggests artisanal approach to wellness",
-                availability_check="High availability, wellness-focused"
-            )
-        ]
-    
-    return suggestions
+logger = logging.getLogger(__name__)
 
-def generate_social_media_channels(formulation: GenerateResponse) -> List[SocialMediaChannel]:
-    """
-    Generate social media channel strategies for the formulation.
-    """
-    if isinstance(formulation, dict):
-        category = formulation.get('category', 'general')
-    else:
-        category = getattr(formulation, 'category', 'general')
-    
-    channels = []
-    
-    # Instagram Strategy
-    instagram_content = [
-        "Behind-the-scenes manufacturing process",
-        "Ingredient spotlight posts",
-        "Customer testimonials and reviews",
-        "Educational content about benefits",
-        "Lifestyle shots with the product",
-        "Before/after results",
-        "Expert endorsements"
-    ]
-    
-    instagram_hashtags = [
-        "#NaturalProducts", "#WellnessJourney", "#HealthyLiving",
-        "#CleanBeauty", "#PetCare", "#OrganicLiving",
-        "#SustainableLiving", "#HealthFirst", "#QualityProducts"
-    ]
-    
-    instagram_tips = [
-        "Post consistently 3-4 times per week",
-        "Use high-quality visuals and videos",
-        "Engage with followers through stories",
-        "Collaborate with influencers in your niche",
-        "Share user-generated content"
-    ]
-    
-    channels.append(SocialMediaChannel(
+# Brand name ideas per formulation category; each suggestion's "category" carries the brand tone
+_BRAND_NAME_IDEAS = {
+    "pet food": (
+        dict(
+            name="Pawsome",
+            meaning="Combination of 'Paws' and 'Awesome'",
+            reasoning="Perfect for pet food as it's playful and memorable",
+            availability_check="High availability for trademark registration"
+        ),
+        dict(
+            name="NutriPaws",
+            meaning="Nutrition + Paws",
+            reasoning="Emphasizes nutrition and pet care",
+            availability_check="Good availability, descriptive but distinctive"
+        ),
+        dict(
+            name="VitalBites",
+            meaning="Vital nutrition in bite-sized portions",
+            reasoning="Suggests health and nutrition benefits",
+            availability_check="Moderate availability, health-focused"
+        )
+    ),
+    "wellness": (
+        dict(
+            name="VitaFlow",
+            meaning="Vitality + Flow of wellness",
+            reasoning="Suggests natural flow of wellness and vitality",
+            availability_check="Good availability, wellness-focused"
+        ),
+        dict(
+            name="PureEssence",
+            meaning="Pure essence of natural ingredients",
+            reasoning="Emphasizes purity and natural ingredients",
+            availability_check="Moderate availability, premium positioning"
+        ),
+        dict(
+            name="WellCore",
+            meaning="Core of wellness",
+            reasoning="Suggests fundamental wellness benefits",
+            availability_check="High availability, modern and clean"
+        )
+    ),
+    "cosmetics": (
+        dict(
+            name="GlowCraft",
+            meaning="Crafting natural glow",
+            reasoning="Suggests artisanal approach to beauty",
+            availability_check="Good availability, beauty-focused"
+        ),
+        dict(
+            name="PureGlow",
+            meaning="Pure natural glow",
+            reasoning="Emphasizes natural beauty and radiance",
+            availability_check="Moderate availability, clean beauty"
+        ),
+        dict(
+            name="VitaBeauty",
+            meaning="Vitality + Beauty",
+            reasoning="Combines health and beauty benefits",
+            availability_check="High availability, wellness-beauty crossover"
+        )
+    ),
+    "general": (
+        dict(
+            name="VitaCraft",
+            meaning="Crafting vitality",
+            reasoning="Suggests artisanal approach to health",
+            availability_check="Good availability, versatile"
+        ),
+        dict(
+            name="PureEssence",
+            meaning="Pure essence of natural ingredients",
+            reasoning="Emphasizes purity and natural ingredients",
+            availability_check="Moderate availability, premium positioning"
+        ),
+        dict(
+            name="WellCraft",
+            meaning="Crafting wellness",
+            reasoning="Suggests artisanal approach to wellness",
+            availability_check="High availability, wellness-focused"
+        )
+    )
+}
+
+def _build_brand_name_suggestions(ideas: Tuple[dict, ...], brand_tone: str) -> Tuple[BrandNameSuggestion, ...]:
+    return tuple(BrandNameSuggestion(category=brand_tone, **idea) for idea in ideas)
+
+# Suggestions are static per (category, tone), so build every combination of the known
+# tones once at import; other tones are built on demand by _brand_name_suggestions
+_KNOWN_BRAND_TONES = frozenset(get_args(BrandTone))
+_BRAND_NAME_SUGGESTIONS = {
+    (category, tone): _build_brand_name_suggestions(ideas, tone)
+    for category, ideas in _BRAND_NAME_IDEAS.items()
+    for tone in _KNOWN_BRAND_TONES
+}
+
+# Social media strategies do not depend on the formulation
+_SOCIAL_MEDIA_CHANNELS = (
+    SocialMediaChannel(
         platform="Instagram",
         content_strategy="Visual storytelling with focus on lifestyle and benefits",
         target_audience="Health-conscious consumers aged 25-45",
         post_frequency="3-4 times per week",
-        content_ideas=instagram_content,
-        hashtag_strategy=instagram_hashtags,
-        engagement_tips=instagram_tips
-    ))
-    
-    # TikTok Strategy
-    tiktok_content = [
-        "Quick ingredient facts",
-        "Manufacturing process videos",
-        "Before/after transformations",
-        "Customer testimonials",
-        "Expert tips and advice",
-        "Product demonstrations",
-        "Trending challenges with your product"
-    ]
-    
-    tiktok_hashtags = [
-        "#WellnessTok", "#HealthTips", "#NaturalProducts",
-        "#PetCare", "#BeautyRoutine", "#HealthyLiving",
-        "#ProductDemo", "#CustomerReview"
-    ]
-    
-    tiktok_tips = [
-        "Create short, engaging videos (15-60 seconds)",
-        "Jump on trending challenges",
-        "Use popular music and effects",
-        "Collaborate with TikTok creators",
-        "Post 1-2 times daily"
-    ]
-    
-    channels.append(SocialMediaChannel(
+        content_ideas=[
+            "Behind-the-scenes manufacturing process",
+            "Ingredient spotlight posts",
+            "Customer testimonials and reviews",
+            "Educational content about benefits",
+            "Lifestyle shots with the product",
+            "Before/after results",
+            "Expert endorsements"
+        ],
+        hashtag_strategy=[
+            "#NaturalProducts", "#WellnessJourney", "#HealthyLiving",
+            "#CleanBeauty", "#PetCare", "#OrganicLiving",
+            "#SustainableLiving", "#HealthFirst", "#QualityProducts"
+        ],
+        engagement_tips=[
+            "Post consistently 3-4 times per week",
+            "Use high-quality visuals and videos",
+            "Engage with followers through stories",
+            "Collaborate with influencers in your niche",
+            "Share user-generated content"
+        ]
+    ),
+    SocialMediaChannel(
         platform="TikTok",
         content_strategy="Short-form educational and entertaining content",
         target_audience="Young consumers aged 18-35",
         post_frequency="1-2 times daily",
-        content_ideas=tiktok_content,
-        hashtag_strategy=tiktok_hashtags,
-        engagement_tips=tiktok_tips
-    ))
-    
-    # YouTube Strategy
-    youtube_content = [
-        "Detailed product reviews and demonstrations",
-        "Expert interviews and collaborations",
-        "Manufacturing process documentaries",
-        "Customer success stories",
-        "Educational content about ingredients",
-        "Comparison videos with competitors",
-        "Behind-the-scenes content"
-    ]
-    
-    youtube_hashtags = [
-        "#NaturalProducts", "#WellnessJourney", "#ProductReview",
-        "#HealthyLiving", "#CleanBeauty", "#PetCare",
-        "#ManufacturingProcess", "#CustomerStories"
-    ]
-    
-    youtube_tips = [
-        "Upload 1-2 videos per week",
-        "Create detailed, informative content",
-        "Optimize titles and descriptions for SEO",
-        "Collaborate with YouTube influencers",
-        "Use end screens and cards for engagement"
-    ]
-    
-    channels.append(SocialMediaChannel(
+        content_ideas=[
+            "Quick ingredient facts",
+            "Manufacturing process videos",
+            "Before/after transformations",
+            "Customer testimonials",
+            "Expert tips and advice",
+            "Product demonstrations",
+            "Trending challenges with your product"
+        ],
+        hashtag_strategy=[
+            "#WellnessTok", "#HealthTips", "#NaturalProducts",
+            "#PetCare", "#BeautyRoutine", "#HealthyLiving",
+            "#ProductDemo", "#CustomerReview"
+        ],
+        engagement_tips=[
+            "Create short, engaging videos (15-60 seconds)",
+            "Jump on trending challenges",
+            "Use popular music and effects",
+            "Collaborate with TikTok creators",
+            "Post 1-2 times daily"
+        ]
+    ),
+    SocialMediaChannel(
         platform="YouTube",
         content_strategy="Long-form educational and review content",
         target_audience="Detailed-oriented consumers aged 25-50",
         post_frequency="1-2 times per week",
-        content_ideas=youtube_content,
-        hashtag_strategy=youtube_hashtags,
-        engagement_tips=youtube_tips
-    ))
-    
-    # LinkedIn Strategy
-    linkedin_content = [
-        "Industry insights and trends",
-        "Company culture and values",
-        "Expert opinions and thought leadership",
-        "Product development stories",
-        "Sustainability initiatives",
-        "Partnership announcements",
-        "Industry event participation"
-    ]
-    
-    linkedin_hashtags = [
-        "#NaturalProducts", "#WellnessIndustry", "#Sustainability",
-        "#Innovation", "#QualityAssurance", "#HealthTech",
-        "#Manufacturing", "#BusinessGrowth"
-    ]
-    
-    linkedin_tips = [
-        "Post 2-3 times per week",
-        "Share industry insights and thought leadership",
-        "Engage with professional network",
-        "Use professional tone and language",
-        "Connect with industry leaders"
-    ]
-    
-    channels.append(SocialMediaChannel(
+        content_ideas=[
+            "Detailed product reviews and demonstrations",
+            "Expert interviews and collaborations",
+            "Manufacturing process documentaries",
+            "Customer success stories",
+            "Educational content about ingredients",
+            "Comparison videos with competitors",
+            "Behind-the-scenes content"
+        ],
+        hashtag_strategy=[
+            "#NaturalProducts", "#WellnessJourney", "#ProductReview",
+            "#HealthyLiving", "#CleanBeauty", "#PetCare",
+            "#ManufacturingProcess", "#CustomerStories"
+        ],
+        engagement_tips=[
+            "Upload 1-2 videos per week",
+            "Create detailed, informative content",
+            "Optimize titles and descriptions for SEO",
+            "Collaborate with YouTube influencers",
+            "Use end screens and cards for engagement"
+        ]
+    ),
+    SocialMediaChannel(
         platform="LinkedIn",
         content_strategy="Professional content focused on industry insights",
         target_audience="B2B customers and industry professionals",
         post_frequency="2-3 times per week",
-        content_ideas=linkedin_content,
-        hashtag_strategy=linkedin_hashtags,
-        engagement_tips=linkedin_tips
-    ))
+        content_ideas=[
+            "Industry insights and trends",
+            "Company culture and values",
+            "Expert opinions and thought leadership",
+            "Product development stories",
+            "Sustainability initiatives",
+            "Partnership announcements",
+            "Industry event participation"
+        ],
+        hashtag_strategy=[
+            "#NaturalProducts", "#WellnessIndustry", "#Sustainability",
+            "#Innovation", "#QualityAssurance", "#HealthTech",
+            "#Manufacturing", "#BusinessGrowth"
+        ],
+        engagement_tips=[
+            "Post 2-3 times per week",
+            "Share industry insights and thought leadership",
+            "Engage with professional network",
+            "Use professional tone and language",
+            "Connect with industry leaders"
+        ]
+    )
+)
+
+# (overall theme, brand personality) per formulation category
+_THEME_BY_CATEGORY = {
+    "pet food": (
+        "Trust, Care, and Quality - Building a brand that pet parents can rely on for their furry family members",
+        "Caring, trustworthy, and playful - like a loving pet parent"
+    ),
+    "wellness": (
+        "Natural Wellness and Vitality - Empowering individuals to take control of their health naturally",
+        "Authentic, knowledgeable, and supportive - like a trusted wellness coach"
+    ),
+    "cosmetics": (
+        "Natural Beauty and Self-Care - Enhancing natural beauty with clean, effective ingredients",
+        "Confident, nurturing, and empowering - like a beauty expert who cares"
+    )
+}
+_DEFAULT_THEME = (
+    "Quality and Trust - Delivering premium products that customers can rely on",
+    "Reliable, innovative, and customer-focused"
+)
+
+# Visual identity guidelines
+_VISUAL_GUIDELINES = (
+    "Use natural, earthy color palettes",
+    "Incorporate clean, minimalist design elements",
+    "Feature high-quality product photography",
+    "Use typography that conveys trust and quality",
+    "Include ingredient-focused imagery",
+    "Maintain consistent brand colors across all platforms"
+)
+
+# Marketing messaging
+_MARKETING_MESSAGES = (
+    "Emphasize natural ingredients and quality",
+    "Highlight health and wellness benefits",
+    "Share customer success stories",
+    "Educate about ingredients and processes",
+    "Build trust through transparency",
+    "Create emotional connections with target audience"
+)
+
+def _brand_name_suggestions(category: str, brand_tone: str) -> Tuple[BrandNameSuggestion, ...]:
+    """
+    Pre-built suggestions for a category and tone, falling back to the generic ideas.
+    """
+    if category not in _BRAND_NAME_IDEAS:
+        category = "general"
+    suggestions = _BRAND_NAME_SUGGESTIONS.get((category, brand_tone))
+    if suggestions is None:
+        suggestions = _build_brand_name_suggestions(_BRAND_NAME_IDEAS[category], brand_tone)
+    return suggestions
+
+def _extract_category(formulation: GenerateResponse) -> str:
+    """
+    Category of a formulation given either as a model or a plain dict.
+    """
+    if isinstance(formulation, dict):
+        return formulation.get('category', 'general')
+    return getattr(formulation, 'category', 'general')
+
+def generate_brand_name_suggestions(formulation: GenerateResponse, brand_tone: str, category: Optional[str] = None) -> List[BrandNameSuggestion]:
+    """
+    Generate brand name suggestions based on the formulation and brand tone.
+    """
+    product_name = formulation["product_name"] if isinstance(formulation, dict) else formulation.product_name
+    if category is None:
+        category = _extract_category(formulation)
     
-    return channels
+    # Debug: Log category detection (skipped entirely unless DEBUG is enabled)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Detected category: %r from formulation", category)
+        logger.debug("Formulation keys: %s", formulation.keys() if isinstance(formulation, dict) else (formulation.__dict__.keys() if hasattr(formulation, '__dict__') else 'No __dict__'))
+    
+    # Brand name suggestions based on category and tone; the pre-built models are shared, so copy them
+    return [suggestion.model_copy(deep=True) for suggestion in _brand_name_suggestions(category, brand_tone)]
+
+def generate_social_media_channels(formulation: GenerateResponse) -> List[SocialMediaChannel]:
+    """
+    Generate social media channel strategies for the formulation.
+    """
+    return [channel.model_copy(deep=True) for channel in _SOCIAL_MEDIA_CHANNELS]
 
 def generate_branding_strategy(request: BrandingRequest) -> BrandingStrategy:
     """
     Generate comprehensive branding strategy for the formulation.
     """
-    formulation = request.formulation
+    category = _extract_category(request.formulation)
+    if category not in _BRAND_NAME_IDEAS:
+        category = "general"
     brand_tone = request.brand_tone or "modern"
-    
+    if brand_tone in _KNOWN_BRAND_TONES:
+        strategy = _build_branding_strategy(category, brand_tone)
+    else:
+        # Any other tone is echoed back as given; build it per request so free-form
+        # values cannot evict the cached strategies for the known tones
+        strategy = _build_branding_strategy.__wrapped__(category, brand_tone)
+    # The cached strategy and the pre-built models inside it are shared between
+    # requests, so each caller gets its own copy to modify
+    return strategy.model_copy(deep=True)
+
+@lru_cache(maxsize=64)
+def _build_branding_strategy(category: str, brand_tone: str) -> BrandingStrategy:
+    """
+    Every part of the strategy is static per (category, tone), so build each combination once.
+    The result is shared: callers go through generate_branding_strategy(), which copies it.
+    """
     # Generate brand name suggestions
-    brand_name_suggestions = generate_brand_name_suggestions(formulation, brand_tone)
+    brand_name_suggestions = list(_brand_name_suggestions(category, brand_tone))
     
     # Generate social media channels
-    social_media_channels = generate_social_media_channels(formulation)
+    social_media_channels = list(_SOCIAL_MEDIA_CHANNELS)
     
     # Determine overall branding theme
-    category = formulation.category if hasattr(formulation, 'category') else 'general'
-    
-    if category == "pet food":
-        overall_theme = "Trust, Care, and Quality - Building a brand that pet parents can rely on for their furry family members"
-        brand_personality = "Caring, trustworthy, and playful - like a loving pet parent"
-    elif category == "wellness":
-        overall_theme = "Natural Wellness and Vitality - Empowering individuals to take control of their health naturally"
-        brand_personality = "Authentic, knowledgeable, and supportive - like a trusted wellness coach"
-    elif category == "cosmetics":
-        overall_theme = "Natural Beauty and Self-Care - Enhancing natural beauty with clean, effective ingredients"
-        brand_personality = "Confident, nurturing, and empowering - like a beauty expert who cares"
-    else:
-        overall_theme = "Quality and Trust - Delivering premium products that customers can rely on"
-        brand_personality = "Reliable, innovative, and customer-focused"
-    
-    # Visual identity guidelines
-    visual_guidelines = [
-        "Use natural, earthy color palettes",
-        "Incorporate clean, minimalist design elements",
-        "Feature high-quality product photography",
-        "Use typography that conveys trust and quality",
-        "Include ingredient-focused imagery",
-        "Maintain consistent brand colors across all platforms"
-    ]
-    
-    # Marketing messaging
-    marketing_messages = [
-        "Emphasize natural ingredients and quality",
-        "Highlight health and wellness benefits",
-        "Share customer success stories",
-        "Educate about ingredients and processes",
-        "Build trust through transparency",
-        "Create emotional connections with target audience"
-    ]
+    overall_theme, brand_personality = _THEME_BY_CATEGORY.get(category, _DEFAULT_THEME)
     
     return BrandingStrategy(
         brand_name_suggestions=brand_name_suggestions,
         social_media_channels=social_media_channels,
         overall_branding_theme=overall_theme,
         brand_personality=brand_personality,
-        visual_identity_guidelines=visual_guidelines,
-        marketing_messaging=marketing_messages
+        visual_identity_guidelines=list(_VISUAL_GUIDELINES),
+        marketing_messaging=list(_MARKETING_MESSAGES)
     )
 
 def analyze_branding(request: BrandingRequest) -> BrandingStrategy:
@@ -3,29 +3,283 @@ Advanced Redis Cache Service for Phase 2 Optimization
 Provides intelligent caching with compression and adaptive TTL.
 """
 
-import json
+import asyncio
 import hashlib
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from fnmatch import fnmatchcase
+from functools import partial
+import orjson
 import redis
-from typing import Any, Optional, Dict, List
+import redis.asyncio as aioredis
+import zstandard
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 import logging
-from dataclasses import dataclass
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Compressed values are stored as this marker byte followed by a zstd frame of orjson bytes;
+# anything else is plain JSON (uncompressed types, or entries written before compression)
+_ZSTD_MAGIC = b"\x01"
+# Level by how often a type is reused: hot types are compressed harder once and
+# decompressed many times, rarely read ones take the cheapest level
+_ZSTD_LEVEL_COLD = 1
+_ZSTD_LEVEL = 3
+_ZSTD_LEVEL_HOT = 9
+
+# Below this a zstd frame's header outweighs what it saves, so small values stay plain JSON
+_COMPRESS_MIN_BYTES = 256
+
+# Trained dictionaries live in Redis (not on local disk) so every worker can decode every entry
+_ZDICT_PREFIX = "brandos:zdict:"
+_ZDICT_SIZE = 16384
+_ZDICT_SAMPLES = 512
+
+# UNLINKs sent per pipeline round-trip when invalidating
+_INVALIDATE_BATCH = 500
+
+# SETEX for every KEYS[i] with ttl ARGV[2i-1] and value ARGV[2i]. Batches stay small
+# because a script blocks other Redis clients while it runs
+_MSETEX_SCRIPT = """
+for i = 1, #KEYS do
+    redis.call('SETEX', KEYS[i], ARGV[i * 2 - 1], ARGV[i * 2])
+end
+return #KEYS
+"""
+_MSETEX_BATCH = 100
+
+# Write-behind queue for set(): bounded so a Redis outage cannot grow memory, and
+# drained in batches of up to _WRITE_BATCH entries
+_WRITE_QUEUE_SIZE = 1024
+_WRITE_BATCH = 64
+
+# In-process cache of decoded hot entries in front of Redis
+_LOCAL_CACHE_SIZE = 4096
+_LOCAL_CACHE_TTL = 60  # seconds
+
 class CacheStrategy(Enum):
     AGGRESSIVE = "aggressive"  # Cache everything for long periods
     BALANCED = "balanced"      # Cache based on usage patterns
     CONSERVATIVE = "conservative"  # Cache only frequently used data
 
-@dataclass
-class CacheStats:
-    hits: int = 0
-    misses: int = 0
-    saves: int = 0
-    compression_ratio: float = 0.0
-    total_saved_tokens: int = 0
+class ZstdDictionaryManager:
+    """
+    Per-data-type zstd dictionaries for small cache payloads.
+    
+    Recent payloads of each type are sampled; once enough are collected a dictionary is
+    trained in a background thread and published to Redis, so every worker process can
+    decode entries compressed with it. zstd frames record their dictionary id, so values
+    written with or without a dictionary decode side by side.
+    """
+    
+    def __init__(self, redis_client: redis.Redis, async_redis_client: Optional[aioredis.Redis] = None):
+        self.redis_client = redis_client
+        # Event-loop callers load dictionaries through this client up front (aload_type /
+        # aload_frame), so compress() and decompress() then find them cached
+        self.async_redis_client = async_redis_client
+        self._samples: Dict[str, deque] = {}
+        self._by_type: Dict[str, zstandard.ZstdCompressionDict] = {}
+        self._by_id: Dict[int, zstandard.ZstdCompressionDict] = {}
+        self._loaded_types = set()
+        self._training = set()
+        self._lock = threading.Lock()
+        # zstd contexts are not thread-safe, so each thread keeps its own: compressors keyed by
+        # (dict id, level), decompressors by dict id (0 = no dictionary)
+        self._local = threading.local()
+    
+    def compress(self, data_type: str, payload: bytes, level: int = _ZSTD_LEVEL) -> bytes:
+        """
+        Compress a payload with the type's dictionary, if one has been trained
+        """
+        dict_data = self._dictionary_for_type(data_type)
+        self._record_sample(data_type, payload)
+        dict_id = dict_data.dict_id() if dict_data is not None else 0
+        return self._compressor(dict_id, dict_data, level).compress(payload)
+    
+    def decompress(self, frame: bytes, fetch: bool = True) -> bytes:
+        """
+        Decompress a frame with whichever dictionary it was written with.
+        
+        With fetch=False only already-loaded dictionaries are used, so the call never
+        touches Redis.
+        """
+        dict_id = zstandard.get_frame_parameters(frame).dict_id
+        if not dict_id:
+            dict_data = None
+        elif fetch:
+            dict_data = self._dictionary_for_id(dict_id)
+        else:
+            dict_data = self._by_id.get(dict_id)
+        if dict_id and dict_data is None:
+            raise ValueError(f"Unknown zstd dictionary {dict_id}")
+        return self._decompressor(dict_id, dict_data).decompress(frame)
+    
+    def _compressor(self, dict_id: int, dict_data: Optional[zstandard.ZstdCompressionDict], level: int) -> zstandard.ZstdCompressor:
+        compressors = getattr(self._local, "compressors", None)
+        if compressors is None:
+            compressors = self._local.compressors = {}
+        compressor = compressors.get((dict_id, level))
+        if compressor is None:
+            compressor = compressors[(dict_id, level)] = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+        return compressor
+    
+    def _decompressor(self, dict_id: int, dict_data: Optional[zstandard.ZstdCompressionDict]) -> zstandard.ZstdDecompressor:
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dict_data)
+        return decompressor
+    
+    def _dictionary_for_type(self, data_type: str) -> Optional[zstandard.ZstdCompressionDict]:
+        if data_type not in self._loaded_types:
+            # Pick up a dictionary another worker already trained for this type
+            self._loaded_types.add(data_type)
+            try:
+                dict_id = self.redis_client.get(f"{_ZDICT_PREFIX}type:{data_type}")
+                if dict_id:
+                    self._adopt_type(data_type, self._dictionary_for_id(int(dict_id)))
+            except Exception as e:
+                logger.warning(f"Failed to load zstd dictionary for {data_type}: {e}")
+        return self._by_type.get(data_type)
+    
+    def _dictionary_for_id(self, dict_id: int) -> Optional[zstandard.ZstdCompressionDict]:
+        dict_data = self._by_id.get(dict_id)
+        if dict_data is None:
+            dict_data = self._adopt_id(dict_id, self.redis_client.get(f"{_ZDICT_PREFIX}{dict_id}"))
+        return dict_data
+    
+    async def aload_type(self, data_type: str):
+        """
+        Load the type's published dictionary through the async client, if not done yet
+        """
+        if data_type in self._loaded_types or self.async_redis_client is None:
+            return
+        self._loaded_types.add(data_type)
+        try:
+            dict_id = await self.async_redis_client.get(f"{_ZDICT_PREFIX}type:{data_type}")
+            if dict_id:
+                dict_data = self._by_id.get(int(dict_id))
+                if dict_data is None:
+                    dict_data = self._adopt_id(int(dict_id), await self.async_redis_client.get(f"{_ZDICT_PREFIX}{int(dict_id)}"))
+                self._adopt_type(data_type, dict_data)
+        except Exception as e:
+            logger.warning(f"Failed to load zstd dictionary for {data_type}: {e}")
+    
+    async def aload_frame(self, frame: bytes):
+        """
+        Load the dictionary a frame was written with through the async client, if not cached
+        """
+        if self.async_redis_client is None:
+            return
+        try:
+            dict_id = zstandard.get_frame_parameters(frame).dict_id
+            if dict_id and dict_id not in self._by_id:
+                self._adopt_id(dict_id, await self.async_redis_client.get(f"{_ZDICT_PREFIX}{dict_id}"))
+        except Exception as e:
+            # Corrupt frames and missing dictionaries surface when the value is decoded
+            logger.warning(f"Failed to load zstd dictionary for frame: {e}")
+    
+    def _adopt_id(self, dict_id: int, raw: Optional[bytes]) -> Optional[zstandard.ZstdCompressionDict]:
+        if not raw:
+            return None
+        dict_data = zstandard.ZstdCompressionDict(raw)
+        with self._lock:
+            return self._by_id.setdefault(dict_id, dict_data)
+    
+    def _adopt_type(self, data_type: str, dict_data: Optional[zstandard.ZstdCompressionDict]):
+        if dict_data is not None:
+            with self._lock:
+                self._by_type.setdefault(data_type, dict_data)
+    
+    def _record_sample(self, data_type: str, payload: bytes):
+        if data_type in self._by_type or data_type in self._training:
+            return
+        with self._lock:
+            samples = self._samples.setdefault(data_type, deque(maxlen=_ZDICT_SAMPLES))
+            samples.append(payload)
+            if len(samples) < _ZDICT_SAMPLES or data_type in self._training:
+                return
+            self._training.add(data_type)
+            batch = list(samples)
+            del self._samples[data_type]
+        threading.Thread(target=self._train, args=(data_type, batch), daemon=True).start()
+    
+    def _train(self, data_type: str, samples: List[bytes]):
+        try:
+            dict_data = zstandard.train_dictionary(_ZDICT_SIZE, samples)
+            dict_id = dict_data.dict_id()
+            # Publish the dictionary before pointing the type at it, so readers can always resolve it
+            self.redis_client.set(f"{_ZDICT_PREFIX}{dict_id}", dict_data.as_bytes())
+            self.redis_client.set(f"{_ZDICT_PREFIX}type:{data_type}", dict_id)
+            with self._lock:
+                self._by_id[dict_id] = dict_data
+                self._by_type[data_type] = dict_data
+            logger.info(f"Trained zstd dictionary {dict_id} for {data_type} from {len(samples)} samples")
+        except Exception as e:
+            logger.warning(f"zstd dictionary training failed for {data_type}: {e}")
+        finally:
+            with self._lock:
+                self._training.discard(data_type)
+
+class LocalTTLCache:
+    """
+    Bounded in-process LRU of serialized (orjson) values with per-entry expiry.
+    
+    Values are immutable bytes, so every caller decodes its own copy and nothing a
+    caller mutates leaks into later hits. Entries expire after at most `ttl` seconds,
+    which bounds how long a write or invalidation made by another worker can go unseen here.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key: bytes, value: bytes, ttl: Optional[float] = None):
+        """
+        Store a value for the shorter of the local TTL and `ttl` (the entry's remaining Redis TTL)
+        """
+        expires_at = time.monotonic() + (min(self.ttl, ttl) if ttl else self.ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def discard(self, keys: List[bytes]):
+        """
+        Drop the given keys, if present
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+    
+    def invalidate(self, pattern: str):
+        """
+        Drop entries whose key matches a Redis-style glob pattern
+        """
+        pattern_bytes = pattern.encode()
+        with self._lock:
+            for key in [key for key in self._entries if fnmatchcase(key, pattern_bytes)]:
+                del self._entries[key]
 
 class AdvancedCacheService:
     """
@@ -33,9 +287,21 @@ class AdvancedCacheService:
     """
     
     def __init__(self, redis_url: str = "redis://localhost:6379", strategy: CacheStrategy = CacheStrategy.BALANCED):
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+        self.redis_client = redis.from_url(redis_url, decode_responses=False)
+        # Async callers use their own pooled client, so concurrent handlers overlap their
+        # Redis round-trips instead of blocking the event loop; the sync client stays for
+        # the synchronous wrappers and worker threads
+        self.async_redis_client = aioredis.from_url(redis_url, max_connections=64, decode_responses=False)
+        # SETEX bound once: skips the per-call attribute lookup, timedelta check and (on
+        # newer redis-py) deprecation wrapper around Redis.setex on the write path
+        self._setex = partial(self.redis_client.execute_command, "SETEX")
+        # Batch writes run as one EVALSHA per batch instead of N pipelined SETEX commands
+        self._msetex = self.redis_client.register_script(_MSETEX_SCRIPT)
+        self._amsetex = self.async_redis_client.register_script(_MSETEX_SCRIPT)
         self.strategy = strategy
-        self.stats = CacheStats()
+        # Hit/miss/save counts, updated under a lock
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
         
         # Cache patterns for different data types
         self.cache_patterns = {
@@ -44,27 +310,60 @@ class AdvancedCacheService:
             "branding": {"ttl": 1800, "compression": True},  # 30 minutes
             "costing": {"ttl": 3600, "compression": True},  # 1 hour
             "scientific": {"ttl": 5400, "compression": True},  # 1.5 hours
+            "suggestions": {"ttl": 3600, "compression": False},  # 1 hour
+            "scientific_reasoning": {"ttl": 5400, "compression": False},  # 1.5 hours
             "default": {"ttl": 1800, "compression": False}  # 30 minutes
         }
         
         # Usage tracking for adaptive caching
-        self.usage_tracker = {}
+        self.usage_tracker = Counter()
+        
+        # Write TTLs and compression flags resolved once per data type, so set() is one lookup
+        self._write_policies = {
+            data_type: self._build_write_policy(pattern)
+            for data_type, pattern in self.cache_patterns.items()
+        }
+        self._default_write_policy = self._write_policies["default"]
+        
+        # Encoded "brandos:{type}:" key prefixes
+        self._key_prefixes: Dict[str, bytes] = {}
+        
+        # Single writes are queued, already serialized, and flushed by a background thread (write-behind)
+        self._write_queue: "queue.Queue[Tuple[str, bytes, bytes, int, bool]]" = queue.Queue(maxsize=_WRITE_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
         
-    def get_cache_key(self, data_type: str, query_hash: str) -> str:
+        # Recently read or written values as uncompressed JSON, so repeat hits skip Redis
+        # and decompression entirely
+        self.local_cache = LocalTTLCache(_LOCAL_CACHE_SIZE, _LOCAL_CACHE_TTL)
+        
+        # zstd compression, with per-type dictionaries once enough samples are seen
+        self.zstd_dictionaries = ZstdDictionaryManager(self.redis_client, self.async_redis_client)
+        
+    def get_cache_key(self, data_type: str, query_hash: bytes) -> bytes:
         """
         Generate cache key with type prefix
         """
-        return f"brandos:{data_type}:{query_hash}"
+        # The readable "brandos:{type}:" prefix keeps pattern invalidation working; the
+        # raw 16-byte digest after it is half the size of its hex form
+        prefix = self._key_prefixes.get(data_type)
+        if prefix is None:
+            prefix = self._key_prefixes[data_type] = f"brandos:{data_type}:".encode()
+        return prefix + query_hash
     
-    def get_query_hash(self, query: str, context: Optional[Dict] = None) -> str:
+    def get_query_hash(self, query: str, context: Optional[Dict] = None) -> bytes:
         """
         Generate hash for query and context
         """
-        query_data = {
-            "query": query,
-            "context": context or {}
-        }
-        return hashlib.md5(json.dumps(query_data, sort_keys=True).encode()).hexdigest()
+        # Feed the query and the canonical context JSON to the hasher separately rather than
+        # wrapping both in a dict and serializing the whole thing; the length prefix keeps
+        # the two fields from running into each other
+        query_bytes = query.encode()
+        hasher = hashlib.blake2b(len(query_bytes).to_bytes(8, "little"), digest_size=16)
+        hasher.update(query_bytes)
+        if context:
+            hasher.update(orjson.dumps(context, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+        return hasher.digest()
     
     def get(self, data_type: str, query: str, context: Optional[Dict] = None) -> Optional[Any]:
         """
@@ -72,54 +371,308 @@ class AdvancedCacheService:
         """
         query_hash = self.get_query_hash(query, context)
         cache_key = self.get_cache_key(data_type, query_hash)
+        value = self._local_lookup(data_type, query_hash, cache_key)
+        if value is not None:
+            return value
         
         try:
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                self.stats.hits += 1
-                self._track_usage(data_type, query_hash)
-                return json.loads(cached_data)
-            else:
-                self.stats.misses += 1
-                return None
+            # The remaining TTL rides along in the same round-trip, so the local copy never outlives Redis
+            cached_data, ttl_ms = self.redis_client.pipeline(transaction=False).get(cache_key).pttl(cache_key).execute()
         except Exception as e:
             logger.error(f"Cache get error: {e}")
             return None
+        return self._lookup_result(data_type, query_hash, cache_key, cached_data, ttl_ms)
     
-    def set(self, data_type: str, query: str, data: Any, context: Optional[Dict] = None, custom_ttl: Optional[int] = None) -> bool:
+    async def aget(self, data_type: str, query: str, context: Optional[Dict] = None) -> Optional[Any]:
         """
-        Cache data with intelligent TTL and compression
+        Async counterpart of get()
         """
         query_hash = self.get_query_hash(query, context)
         cache_key = self.get_cache_key(data_type, query_hash)
+        value = self._local_lookup(data_type, query_hash, cache_key)
+        if value is not None:
+            return value
         
-        # Get cache pattern
-        pattern = self.cache_patterns.get(data_type, self.cache_patterns["default"])
-        ttl = custom_ttl or pattern["ttl"]
+        try:
+            async with self.async_redis_client.pipeline(transaction=False) as pipe:
+                cached_data, ttl_ms = await pipe.get(cache_key).pttl(cache_key).execute()
+        except Exception as e:
+            logger.error(f"Cache get error: {e}")
+            return None
+        await self._aload_dictionaries([cached_data])
+        return self._lookup_result(data_type, query_hash, cache_key, cached_data, ttl_ms, fetch=False)
+    
+    def mget(self, entries: List[Tuple[str, str, Optional[Dict]]]) -> List[Optional[Any]]:
+        """
+        Get several (data_type, query, context) entries in one Redis round-trip
+        """
+        keys, results, missing = self._local_lookup_many(entries)
+        if not missing:
+            return results
         
-        # Apply adaptive TTL based on strategy
-        ttl = self._get_adaptive_ttl(data_type, ttl)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for i in missing:
+                pipe.get(keys[i][2]).pttl(keys[i][2])
+            raw_values = pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache mget error: {e}")
+            return results
+        
+        for i, cached_data, ttl_ms in zip(missing, raw_values[0::2], raw_values[1::2]):
+            results[i] = self._lookup_result(*keys[i], cached_data, ttl_ms)
+        return results
+    
+    async def amget(self, entries: List[Tuple[str, str, Optional[Dict]]]) -> List[Optional[Any]]:
+        """
+        Async counterpart of mget()
+        """
+        keys, results, missing = self._local_lookup_many(entries)
+        if not missing:
+            return results
         
         try:
-            # Compress data if enabled
-            if pattern.get("compression", False):
-                data = self._compress_data(data)
-            
-            # Store in cache
-            success = self.redis_client.setex(
-                cache_key,
-                ttl,
-                json.dumps(data, separators=(',', ':'))
-            )
-            
-            if success:
-                self.stats.saves += 1
-                self._track_usage(data_type, query_hash)
-            
-            return success
+            async with self.async_redis_client.pipeline(transaction=False) as pipe:
+                for i in missing:
+                    pipe.get(keys[i][2]).pttl(keys[i][2])
+                raw_values = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache mget error: {e}")
+            return results
+        
+        await self._aload_dictionaries(raw_values[0::2])
+        for i, cached_data, ttl_ms in zip(missing, raw_values[0::2], raw_values[1::2]):
+            results[i] = self._lookup_result(*keys[i], cached_data, ttl_ms, fetch=False)
+        return results
+    
+    async def _aload_dictionaries(self, raw_values: List[Optional[bytes]]):
+        """
+        Fetch the zstd dictionaries these values were written with through the async
+        client, so decoding them afterwards never blocks the event loop on Redis
+        """
+        for raw in raw_values:
+            if raw and raw[:1] == _ZSTD_MAGIC:
+                await self.zstd_dictionaries.aload_frame(raw[1:])
+    
+    def _local_lookup(self, data_type: str, query_hash: bytes, cache_key: bytes) -> Optional[Any]:
+        """
+        Serve a hit from the in-process cache, skipping the Redis round-trip and decode
+        """
+        payload = self.local_cache.get(cache_key)
+        if payload is None:
+            return None
+        self._count("hits", data_type)
+        return orjson.loads(payload)
+    
+    def _local_lookup_many(self, entries: List[Tuple[str, str, Optional[Dict]]]) -> Tuple[List[Tuple[str, bytes, bytes]], List[Optional[Any]], List[int]]:
+        """
+        Keys, locally cached values and the indexes still to fetch from Redis for a batch
+        """
+        keys = []
+        for data_type, query, context in entries:
+            query_hash = self.get_query_hash(query, context)
+            keys.append((data_type, query_hash, self.get_cache_key(data_type, query_hash)))
+        results = [self._local_lookup(*key) for key in keys]
+        missing = [i for i, value in enumerate(results) if value is None]
+        return keys, results, missing
+    
+    def _lookup_result(self, data_type: str, query_hash: bytes, cache_key: bytes, cached_data: Optional[bytes], ttl_ms: int, fetch: bool = True) -> Optional[Any]:
+        """
+        Decode a fetched value, keep it locally and record the hit or miss
+        """
+        if not cached_data:
+            self._count("misses")
+            return None
+        try:
+            payload = self._decompress(cached_data, fetch)
+            value = orjson.loads(payload)
+        except Exception as e:
+            # Undecodable entries (e.g. a zstd dictionary that is gone) count as misses
+            logger.error(f"Cache decode error: {e}")
+            self._count("misses")
+            return None
+        self.local_cache.set(cache_key, payload, ttl_ms / 1000 if ttl_ms > 0 else None)
+        self._count("hits", data_type)
+        return value
+    
+    def set(self, data_type: str, query: str, data: Any, context: Optional[Dict] = None, custom_ttl: Optional[int] = None) -> bool:
+        """
+        Cache data with intelligent TTL and compression.
+        
+        The write is queued for a background writer and this returns without waiting for
+        Redis: True means the entry was accepted (and is already served from the local
+        cache), not that Redis has stored it. Writes that then fail are dropped from the
+        local cache and counted as "write_errors" in get_stats(); flush_writes() waits for
+        the queue to drain. `data` is serialized before this returns, so the caller may
+        keep mutating it.
+        """
+        query_hash = self.get_query_hash(query, context)
+        cache_key = self.get_cache_key(data_type, query_hash)
+        ttl, compress = self._write_policy(data_type, custom_ttl)
+        try:
+            payload = orjson.dumps(data)
         except Exception as e:
             logger.error(f"Cache set error: {e}")
             return False
+        
+        self._ensure_writer()
+        try:
+            self._write_queue.put_nowait((data_type, cache_key, payload, ttl, compress))
+        except queue.Full:
+            logger.warning(f"Cache write queue full, dropping {data_type} entry")
+            return False
+        self.local_cache.set(cache_key, payload, ttl)
+        return True
+    
+    async def aset(self, data_type: str, query: str, data: Any, context: Optional[Dict] = None, custom_ttl: Optional[int] = None) -> bool:
+        """
+        Async counterpart of set(); queuing never blocks, so it is the same call
+        """
+        return self.set(data_type, query, data, context, custom_ttl)
+    
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._writer_loop, name="cache-writer", daemon=True)
+                    self._writer.start()
+    
+    def _writer_loop(self):
+        """
+        Drain queued writes, compressing them here rather than on the request path and
+        sending up to _WRITE_BATCH of them per Redis command
+        """
+        while True:
+            pending = [self._write_queue.get()]
+            while len(pending) < _WRITE_BATCH:
+                try:
+                    pending.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                writes = [
+                    (data_type, cache_key, payload, ttl, self._compress(data_type, payload, compress))
+                    for data_type, cache_key, payload, ttl, compress in pending
+                ]
+                if len(writes) == 1:
+                    _, cache_key, _, ttl, payload = writes[0]
+                    self._setex(cache_key, ttl, payload)
+                else:
+                    keys, args = self._msetex_arguments(writes)
+                    self._msetex(keys=keys, args=args)
+                self._record_saves(writes)
+            except Exception as e:
+                logger.error(f"Cache set error: {e}")
+                # None of the batch reached Redis, so stop serving it locally
+                self.local_cache.discard([cache_key for _, cache_key, _, _, _ in pending])
+                with self._stats_lock:
+                    self.stats["write_errors"] += len(pending)
+            finally:
+                for _ in pending:
+                    self._write_queue.task_done()
+    
+    def flush_writes(self):
+        """
+        Block until every write queued by set() so far has been sent to Redis (or failed)
+        """
+        self._write_queue.join()
+    
+    def mset(self, entries: List[Tuple[str, str, Any, Optional[Dict]]]) -> bool:
+        """
+        Cache several (data_type, query, data, context) entries in one Redis command per batch
+        """
+        writes = self._prepare_writes(entries)
+        # Until a batch is confirmed its keys may hold either value in Redis, so the
+        # superseded local copies must not be served in the meantime
+        self.local_cache.discard([cache_key for _, cache_key, _, _, _ in writes])
+        try:
+            for start in range(0, len(writes), _MSETEX_BATCH):
+                batch = writes[start:start + _MSETEX_BATCH]
+                keys, args = self._msetex_arguments(batch)
+                self._msetex(keys=keys, args=args)
+                self._record_saves(batch)
+        except Exception as e:
+            logger.error(f"Cache mset error: {e}")
+            return False
+        return True
+    
+    async def amset(self, entries: List[Tuple[str, str, Any, Optional[Dict]]]) -> bool:
+        """
+        Async counterpart of mset()
+        """
+        # Compressing looks up each type's dictionary; load them here without blocking
+        for data_type in {entry[0] for entry in entries}:
+            await self.zstd_dictionaries.aload_type(data_type)
+        writes = self._prepare_writes(entries)
+        self.local_cache.discard([cache_key for _, cache_key, _, _, _ in writes])
+        try:
+            for start in range(0, len(writes), _MSETEX_BATCH):
+                batch = writes[start:start + _MSETEX_BATCH]
+                keys, args = self._msetex_arguments(batch)
+                await self._amsetex(keys=keys, args=args)
+                self._record_saves(batch)
+        except Exception as e:
+            logger.error(f"Cache mset error: {e}")
+            return False
+        return True
+    
+    def _prepare_writes(self, entries: List[Tuple[str, str, Any, Optional[Dict]]]) -> List[Tuple[str, bytes, bytes, int, bytes]]:
+        """
+        (data_type, cache_key, JSON payload, ttl, stored payload) for each entry of a batch write
+        """
+        writes = []
+        for data_type, query, data, context in entries:
+            ttl, compress = self._write_policy(data_type)
+            cache_key = self.get_cache_key(data_type, self.get_query_hash(query, context))
+            payload = orjson.dumps(data)
+            writes.append((data_type, cache_key, payload, ttl, self._compress(data_type, payload, compress)))
+        return writes
+    
+    @staticmethod
+    def _msetex_arguments(batch: List[Tuple[str, bytes, bytes, int, bytes]]) -> Tuple[List[bytes], List[Any]]:
+        keys = []
+        args = []
+        for _, cache_key, _, ttl, payload in batch:
+            keys.append(cache_key)
+            args.append(ttl)
+            args.append(payload)
+        return keys, args
+    
+    def _record_saves(self, batch: List[Tuple[str, bytes, bytes, int, bytes]]):
+        """
+        Record stats and keep local copies for a batch of completed writes
+        """
+        for data_type, cache_key, payload, ttl, _ in batch:
+            self.local_cache.set(cache_key, payload, ttl)
+            self._count("saves", data_type)
+    
+    def _write_policy(self, data_type: str, custom_ttl: Optional[int] = None) -> Tuple[int, bool]:
+        """
+        TTL and compression flag for a write of this data type
+        """
+        cold_ttl, ttl, hot_ttl, compress = self._write_policies.get(data_type, self._default_write_policy)
+        if custom_ttl:
+            return self._get_adaptive_ttl(data_type, custom_ttl), compress
+        
+        # Adaptive TTL, pre-resolved for the configured strategy
+        usage_count = self.usage_tracker[data_type]
+        if usage_count > 10:
+            return hot_ttl, compress
+        if usage_count < 3:
+            return cold_ttl, compress
+        return ttl, compress
+    
+    def _build_write_policy(self, pattern: Dict[str, Any]) -> Tuple[int, int, int, bool]:
+        """
+        (rarely used, normal, frequently used) TTLs plus the compression flag for a cache pattern
+        """
+        base_ttl = pattern["ttl"]
+        if self.strategy == CacheStrategy.BALANCED:
+            cold_ttl, ttl, hot_ttl = int(base_ttl // 1.5), base_ttl, int(base_ttl * 1.5)
+        else:
+            # Aggressive and conservative TTLs ignore usage
+            cold_ttl = ttl = hot_ttl = self._get_adaptive_ttl("default", base_ttl)
+        return cold_ttl, ttl, hot_ttl, pattern.get("compression", False)
     
     def _get_adaptive_ttl(self, data_type: str, base_ttl: int) -> int:
         """
@@ -130,7 +683,7 @@ class AdvancedCacheService:
         elif self.strategy == CacheStrategy.CONSERVATIVE:
             return base_ttl // 2
         else:  # BALANCED
-            usage_count = self.usage_tracker.get(data_type, 0)
+            usage_count = self.usage_tracker[data_type]
             if usage_count > 10:
                 return int(base_ttl * 1.5)
             elif usage_count < 3:
@@ -138,54 +691,75 @@ class AdvancedCacheService:
             else:
                 return base_ttl
     
-    def _compress_data(self, data: Any) -> Any:
-        """
-        Compress data for storage
-        """
-        if isinstance(data, dict):
-            compressed = {}
-            for key, value in data.items():
-                # Compress key names
-                compressed_key = self._compress_key(key)
-                compressed[compressed_key] = value
-            return compressed
-        return data
-    
-    def _compress_key(self, key: str) -> str:
-        """
-        Compress dictionary keys
-        """
-        key_mapping = {
-            "ingredients": "ing",
-            "manufacturing": "mfg",
-            "scientific_reasoning": "sci",
-            "market_research": "mrkt",
-            "branding_strategy": "brand",
-            "cost_analysis": "cost",
-            "safety_assessment": "safety",
-            "recommendations": "rec",
-            "benefits": "ben",
-            "features": "feat"
-        }
-        return key_mapping.get(key, key)
+    def _compress(self, data_type: str, payload: bytes, compress: bool) -> bytes:
+        """
+        Stored form of a JSON payload: zstd-compressed when enabled and worth it
+        """
+        if compress and len(payload) >= _COMPRESS_MIN_BYTES:
+            # Any level decodes with the same decompressor, so the level needs no marker
+            usage_count = self.usage_tracker[data_type]
+            level = _ZSTD_LEVEL_HOT if usage_count > 20 else _ZSTD_LEVEL if usage_count > 3 else _ZSTD_LEVEL_COLD
+            return _ZSTD_MAGIC + self.zstd_dictionaries.compress(data_type, payload, level)
+        return payload
+    
+    def _decompress(self, raw: bytes, fetch: bool = True) -> bytes:
+        """
+        JSON payload of a stored value, decompressing zstd payloads and passing legacy JSON through
+        """
+        if raw[:1] == _ZSTD_MAGIC:
+            return self.zstd_dictionaries.decompress(raw[1:], fetch)
+        return raw
     
-    def _track_usage(self, data_type: str, query_hash: str):
+    def _count(self, stat: str, data_type: Optional[str] = None):
         """
-        Track usage patterns for adaptive caching
+        Bump a stats counter, and the data type's usage count, atomically
         """
-        if data_type not in self.usage_tracker:
-            self.usage_tracker[data_type] = 0
-        self.usage_tracker[data_type] += 1
+        # Sync wrappers run in worker threads, so a bare += could lose updates
+        with self._stats_lock:
+            self.stats[stat] += 1
+            if data_type is not None:
+                self.usage_tracker[data_type] += 1
     
     def invalidate_pattern(self, pattern: str) -> int:
         """
         Invalidate cache entries matching pattern
         """
         try:
-            keys = self.redis_client.keys(f"brandos:{pattern}:*")
-            if keys:
-                return self.redis_client.delete(*keys)
+            # A write queued before this call must not land after the UNLINKs and resurrect its key
+            self.flush_writes()
+            # SCAN walks the keyspace incrementally and UNLINK frees memory off the main
+            # Redis thread, so invalidation never blocks other clients the way KEYS + DEL did
+            self.local_cache.invalidate(f"brandos:{pattern}:*")
+            deleted = 0
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in self.redis_client.scan_iter(match=f"brandos:{pattern}:*", count=1000):
+                pipe.unlink(key)
+                if len(pipe) >= _INVALIDATE_BATCH:
+                    deleted += sum(pipe.execute())
+            if len(pipe):
+                deleted += sum(pipe.execute())
+            return deleted
+        except Exception as e:
+            logger.error(f"Cache invalidation error: {e}")
             return 0
+    
+    async def ainvalidate_pattern(self, pattern: str) -> int:
+        """
+        Async counterpart of invalidate_pattern()
+        """
+        try:
+            if self._write_queue.unfinished_tasks:
+                await asyncio.to_thread(self.flush_writes)
+            self.local_cache.invalidate(f"brandos:{pattern}:*")
+            deleted = 0
+            async with self.async_redis_client.pipeline(transaction=False) as pipe:
+                async for key in self.async_redis_client.scan_iter(match=f"brandos:{pattern}:*", count=1000):
+                    pipe.unlink(key)
+                    if len(pipe) >= _INVALIDATE_BATCH:
+                        deleted += sum(await pipe.execute())
+                if len(pipe):
+                    deleted += sum(await pipe.execute())
+            return deleted
         except Exception as e:
             logger.error(f"Cache invalidation error: {e}")
             return 0
@@ -194,24 +768,30 @@ class AdvancedCacheService:
         """
         Get cache statistics
         """
-        total_requests = self.stats.hits + self.stats.misses
-        hit_rate = (self.stats.hits / total_requests * 100) if total_requests > 0 else 0
+        with self._stats_lock:
+            hits, misses, saves = self.stats["hits"], self.stats["misses"], self.stats["saves"]
+            write_errors = self.stats["write_errors"]
+            usage_patterns = dict(self.usage_tracker)
+        total_requests = hits + misses
+        hit_rate = (hits / total_requests * 100) if total_requests > 0 else 0
         
         return {
-            "hits": self.stats.hits,
-            "misses": self.stats.misses,
-            "saves": self.stats.saves,
+            "hits": hits,
+            "misses": misses,
+            "saves": saves,
+            "write_errors": write_errors,
             "hit_rate": hit_rate,
             "total_requests": total_requests,
-            "usage_patterns": self.usage_tracker
+            "usage_patterns": usage_patterns
         }
     
     def clear_stats(self):
         """
         Clear cache statistics
         """
-        self.stats = CacheStats()
-        self.usage_tracker = {}
+        with self._stats_lock:
+            self.stats = Counter()
+            self.usage_tracker = Counter()
 
 class CacheMiddleware:
     """
@@ -225,13 +805,25 @@ class CacheMiddleware:
         """
         Get cached response if available
         """
-        return self.cache_service.get(data_type, query, context)
+        return await self.cache_service.aget(data_type, query, context)
     
     async def cache_response(self, data_type: str, query: str, data: Any, context: Optional[Dict] = None) -> bool:
         """
         Cache API response
         """
-        return self.cache_service.set(data_type, query, data, context)
+        return await self.cache_service.aset(data_type, query, data, context)
+    
+    async def get_cached_many(self, entries: List[Tuple[str, str, Optional[Dict]]]) -> List[Optional[Any]]:
+        """
+        Get several cached responses in one round-trip
+        """
+        return await self.cache_service.amget(entries)
+    
+    async def cache_many(self, entries: List[Tuple[str, str, Any, Optional[Dict]]]) -> bool:
+        """
+        Cache several API responses in one round-trip
+        """
+        return await self.cache_service.amset(entries)
 
 # Global cache service instance
 cache_service = AdvancedCacheService()
@@ -263,10 +855,46 @@ async def cache_market_research(query: str, data: Any, context: Optional[Dict] =
     """Cache market research data"""
     return await cache_middleware.cache_response("market_research", query, data, context)
 
+def get_cached_market_research_sync(query: str, context: Optional[Dict] = None) -> Optional[Any]:
+    """Get cached market research data (synchronous)"""
+    return cache_service.get("market_research", normalize_prompt(query), context)
+
+def cache_market_research_sync(query: str, data: Any, context: Optional[Dict] = None) -> bool:
+    """Cache market research data (synchronous)"""
+    return cache_service.set("market_research", normalize_prompt(query), data, context)
+
 async def get_cached_branding(query: str, context: Optional[Dict] = None) -> Optional[Any]:
     """Get cached branding data"""
     return await cache_middleware.get_cached_response("branding", query, context)
 
 async def cache_branding(query: str, data: Any, context: Optional[Dict] = None) -> bool:
     """Cache branding data"""
-    return await cache_middleware.cache_response("branding", query, data, context) 
\ No newline at end of file
+    return await cache_middleware.cache_response("branding", query, data, context)
+
+def normalize_prompt(prompt: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of a prompt, so near-identical queries share a cache entry"""
+    return " ".join((prompt or "").lower().split())
+
+def get_cached_suggestions_sync(query: str, context: Optional[Dict] = None) -> Optional[Any]:
+    """Get cached query suggestions (synchronous)"""
+    return cache_service.get("suggestions", normalize_prompt(query), context)
+
+def cache_suggestions_sync(query: str, data: Any, context: Optional[Dict] = None) -> bool:
+    """Cache query suggestions (synchronous)"""
+    return cache_service.set("suggestions", normalize_prompt(query), data, context)
+
+async def get_cached_scientific_reasoning(query: str, context: Optional[Dict] = None) -> Optional[Any]:
+    """Get cached scientific reasoning"""
+    return await cache_middleware.get_cached_response("scientific_reasoning", normalize_prompt(query), context)
+
+async def cache_scientific_reasoning(query: str, data: Any, context: Optional[Dict] = None) -> bool:
+    """Cache scientific reasoning"""
+    return await cache_middleware.cache_response("scientific_reasoning", normalize_prompt(query), data, context)
+
+async def get_cached_many(entries: List[Tuple[str, str, Optional[Dict]]]) -> List[Optional[Any]]:
+    """Get cached data for several (data_type, query, context) entries in one Redis round-trip"""
+    return await cache_middleware.get_cached_many(entries)
+
+async def cache_many(entries: List[Tuple[str, str, Any, Optional[Dict]]]) -> bool:
+    """Cache several (data_type, query, data, context) entries in one Redis round-trip"""
+    return await cache_middleware.cache_many(entries)
@@ -2,28 +2,28 @@ from app.models.generate import GenerateResponse
 from app.models.costing import ManufacturingScenario, ManufacturingInsights, ManufacturingRequest, ManufacturingResponse, CostingBreakdown
 from typing import List, Dict
 import json
+import logging
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
+from app.services.openai_client import create_chat_completion, get_openai_client
+from app.core.config import load_env
 
-# Load environment variables from the root .env file
-# The .env file is in the project root (one level up from backend)
-load_dotenv(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
+# Load environment variables from the .env files (once per process)
+load_env()
+
+logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client
 client = None
 try:
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key and api_key != "your_openai_api_key_here" and api_key.strip():
-        client = OpenAI(api_key=api_key)
-        print("✅ OpenAI client initialized successfully for costing service")
-        print(f"🔍 API Key found: {'Yes' if api_key else 'No'}")
-        if api_key:
-            print(f"🔍 API Key length: {len(api_key)}")
+        client = get_openai_client(api_key)
+        logger.info("✅ OpenAI client initialized successfully for costing service")
+        logger.debug("🔍 API Key length: %d", len(api_key))
     else:
-        print("⚠️ OpenAI API key not found for costing service, will use fallback data")
+        logger.warning("⚠️ OpenAI API key not found for costing service, will use fallback data")
 except Exception as e:
-    print(f"⚠️ Failed to initialize OpenAI client for costing service: {e}")
+    logger.warning("⚠️ Failed to initialize OpenAI client for costing service: %s", e)
 
 def create_costing_prompt(formulation: GenerateResponse, category: str) -> str:
     """
@@ -52,14 +52,15 @@ def fetch_costing_from_openai(formulation: GenerateResponse, category: str) -> d
     Fetch costing analysis from OpenAI.
     """
     if not client:
-        print("❌ OpenAI client not available, using fallback costing")
+        logger.warning("❌ OpenAI client not available, using fallback costing")
         return generate_fallback_costing(formulation, category)
     
     try:
         prompt = create_costing_prompt(formulation, category)
         
-        print("📤 Sending costing request to OpenAI...")
-        response = client.chat.completions.create(
+        logger.info("📤 Sending costing request to OpenAI...")
+        response = create_chat_completion(
+            client,
             model="gpt-4-turbo-preview",
             messages=[
                 {"role": "system", "content": "You are a senior manufacturing and financial analyst specializing in product costing and pricing strategies."},
@@ -69,7 +70,7 @@ def fetch_costing_from_openai(formulation: GenerateResponse, category: str) -> d
             max_tokens=4000
         )
         
-        print("📥 Received costing response from OpenAI")
+        logger.info("📥 Received costing response from OpenAI")
         content = response.choices[0].message.content
         
         # Try to parse JSON from the response
@@ -83,23 +84,23 @@ def fetch_costing_from_openai(formulation: GenerateResponse, category: str) -> d
                 json_content = content.strip()
             
             costing_data = json.loads(json_content)
-            print("✅ Successfully parsed costing data from OpenAI")
+            logger.info("✅ Successfully parsed costing data from OpenAI")
             return costing_data
             
         except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse JSON from OpenAI response: {e}")
-            print(f"Raw response: {content}")
+            logger.error("❌ Failed to parse JSON from OpenAI response: %s", e)
+            logger.debug("Raw response: %s", content)
             return generate_fallback_costing(formulation, category)
             
     except Exception as e:
-        print(f"❌ Error fetching costing from OpenAI: {e}")
+        logger.error("❌ Error fetching costing from OpenAI: %s", e)
         return generate_fallback_costing(formulation, category)
 
 def generate_fallback_costing(formulation: GenerateResponse, category: str) -> dict:
     """
     Generate fallback costing data when OpenAI is unavailable.
     """
-    print("🔄 Generating fallback costing data")
+    logger.info("🔄 Generating fallback costing data")
     
     # Base costs vary by category
     category_multipliers = {
@@ -303,14 +304,14 @@ def analyze_manufacturing(request: ManufacturingRequest) -> ManufacturingInsight
     """
     Analyze manufacturing scenarios for different customer scales.
     """
-    print("🔍 Analyzing manufacturing scenarios...")
+    logger.info("🔍 Analyzing manufacturing scenarios...")
     
     # Validate and complete formulation data
     formulation = request.formulation
     
     # Ensure ingredients have required fields
     if not hasattr(formulation, 'ingredients') or not formulation.ingredients:
-        print("⚠️ No ingredients found, using fallback data")
+        logger.warning("⚠️ No ingredients found, using fallback data")
         formulation.ingredients = [
             {
                 "name": "Water",
@@ -345,8 +346,7 @@ def analyze_manufacturing(request: ManufacturingRequest) -> ManufacturingInsight
     if not hasattr(formulation, 'safety_notes') or not formulation.safety_notes:
         formulation.safety_notes = ["Sample safety note"]
     
-    print(f"📊 Analyzing formulation: {formulation.product_name}")
-    print(f"📦 Ingredients count: {len(formulation.ingredients)}")
+    logger.info("📊 Analyzing formulation: %s (%d ingredients)", formulation.product_name, len(formulation.ingredients))
     
     # Determine category from product name or use default
     category = "cosmetics"  # Default category
@@ -363,7 +363,7 @@ def analyze_manufacturing(request: ManufacturingRequest) -> ManufacturingInsight
     elif "masala" in formulation.product_name.lower() or "spice" in formulation.product_name.lower() or "blend" in formulation.product_name.lower():
         category = "desi masala"
     
-    print(f"🏷️ Category: {category}")
+    logger.debug("🏷️ Category: %s", category)
     
     # Fetch costing data
     costing_data = fetch_costing_from_openai(formulation, category)
@@ -1,11 +1,14 @@
 import os
 import json
+import asyncio
+import logging
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
-from openai import OpenAI
 from app.models.generate import GenerateRequest, GenerateResponse, IngredientDetail, SupplierInfo
 from app.services.scientific_reasoning_service import ScientificReasoningService
 from app.models.scientific_reasoning import ScientificReasoningRequest
+from app.core.config import load_env
+from app.services.openai_client import create_chat_completion, acreate_chat_completion, get_openai_client, get_async_openai_client
 
 # Phase 2 Optimization imports
 from app.utils.advanced_compression import compress_api_response, CompressionLevel
@@ -13,23 +16,34 @@ from app.services.cache_service import get_cached_formulation_sync, cache_formul
 from app.services.adaptive_prompt_service import prompt_optimizer
 from app.services.streaming_service import streaming_middleware
 
-# Load environment variables from the root .env file
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
+logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client only if API key is available
+# Load environment variables from the .env files (once per process)
+load_env()
+
+class FormulationUnavailableError(RuntimeError):
+    """Raised when no real (OpenAI-generated or cached) formulation could be produced"""
+
+# Initialize OpenAI clients only if API key is available. The async client is looked up
+# per call (by key) rather than held here, because shutdown closes the HTTP pool it rides on
 client = None
+async_api_key = None
 try:
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key and api_key != "your_openai_api_key_here" and api_key.strip():
-        client = OpenAI(api_key=api_key)
-        print("✅ OpenAI client initialized successfully")
-        print(f"🔍 API Key found: {'Yes' if api_key else 'No'}")
-        if api_key:
-            print(f"🔍 API Key length: {len(api_key)}")
+        client = get_openai_client(api_key)
+        async_api_key = api_key
+        logger.info("✅ OpenAI client initialized successfully")
+        logger.debug("🔍 API Key length: %d", len(api_key))
     else:
-        print("⚠️ OpenAI API key not found or invalid, will use fallback mock data")
+        logger.warning("⚠️ OpenAI API key not found or invalid, will use fallback mock data")
 except Exception as e:
-    print(f"⚠️ Failed to initialize OpenAI client: {e}")
+    logger.warning("⚠️ Failed to initialize OpenAI client: %s", e)
+
+@lru_cache(maxsize=1)
+def _scientific_reasoning_service() -> ScientificReasoningService:
+    """Shared ScientificReasoningService so its OpenAI clients are created once per process"""
+    return ScientificReasoningService()
 
 # Function calling definitions
 def get_formulation_function_definitions():
@@ -238,66 +252,55 @@ def get_formulation_function_definitions():
         }
     ]
 
-def generate_formulation(req: GenerateRequest) -> GenerateResponse:
-    """
-    Use OpenAI to generate a real formulation based on the request with Phase 2 optimizations.
-    """
-    print(f"🔍 Starting formulation generation for: {req.prompt}")
-    category = (req.category or '').lower()
-    
-    # Phase 2: Check cache first
+def _lookup_cached_formulation(req: GenerateRequest, category: str) -> Optional[GenerateResponse]:
+    """Phase 2: return the cached formulation for this prompt/category, if any"""
     try:
         cached_response = get_cached_formulation_sync(req.prompt, {"category": category})
         if cached_response:
-            print("✅ Using cached formulation response")
+            logger.info("✅ Using cached formulation response")
             return GenerateResponse(**cached_response)
     except Exception as e:
-        print(f"⚠️ Cache check failed: {e}")
-    
-    # Check if OpenAI client is available
-    if not client:
-        print("🔄 Using fallback mock formulation (OpenAI not available)")
-        return _generate_mock_formulation(req)
-    
-    print("✅ OpenAI client is available, proceeding with API call")
+        logger.warning("⚠️ Cache check failed: %s", e)
+    return None
+
+def _build_formulation_messages(req: GenerateRequest, category: str) -> List[Dict[str, str]]:
+    """Build the system/user messages for the formulation function call"""
+    # Phase 2: Use adaptive prompt optimization only if the prompt is not already comprehensive
+    # Check if the prompt is already a detailed formulation request
+    is_comprehensive_prompt = (
+        len(req.prompt) > 200 and (
+            "Formulate a" in req.prompt or
+            "Create a" in req.prompt or
+            "Develop a" in req.prompt or
+            "body wash" in req.prompt.lower() or
+            "body lotion" in req.prompt.lower() or
+            "face cream" in req.prompt.lower() or
+            "shampoo" in req.prompt.lower() or
+            "conditioner" in req.prompt.lower() or
+            "serum" in req.prompt.lower() or
+            "moisturizer" in req.prompt.lower()
+        )
+    )
     
-    try:
-        # Phase 2: Use adaptive prompt optimization only if the prompt is not already comprehensive
-        # Check if the prompt is already a detailed formulation request
-        is_comprehensive_prompt = (
-            len(req.prompt) > 200 and (
-                "Formulate a" in req.prompt or
-                "Create a" in req.prompt or
-                "Develop a" in req.prompt or
-                "body wash" in req.prompt.lower() or
-                "body lotion" in req.prompt.lower() or
-                "face cream" in req.prompt.lower() or
-                "shampoo" in req.prompt.lower() or
-                "conditioner" in req.prompt.lower() or
-                "serum" in req.prompt.lower() or
-                "moisturizer" in req.prompt.lower()
-            )
+    if is_comprehensive_prompt:
+        logger.info("🎯 Using original comprehensive prompt without optimization")
+        logger.debug("🎯 Original prompt: %.100s...", req.prompt)
+        optimized_prompt = req.prompt
+    else:
+        logger.info("🔄 Using prompt optimization")
+        optimized_prompt = prompt_optimizer.create_formulation_prompt(
+            req.prompt,
+            product_type=req.category,
+            category=category,
+            requirements=[req.target_cost] if req.target_cost else [],
+            region="India"
         )
-        
-        if is_comprehensive_prompt:
-            print("🎯 Using original comprehensive prompt without optimization")
-            print(f"🎯 Original prompt: {req.prompt[:100]}...")
-            optimized_prompt = req.prompt
-        else:
-            print("🔄 Using prompt optimization")
-            optimized_prompt = prompt_optimizer.create_formulation_prompt(
-                req.prompt,
-                product_type=req.category,
-                category=category,
-                requirements=[req.target_cost] if req.target_cost else [],
-                region="India"
-            )
-            print(f"🔄 Optimized prompt: {optimized_prompt[:100]}...")
-        
-        # Create the system prompt with Phase 2 optimizations
-        detailed_steps_instruction = ""
-        if req.detailed_steps:
-            detailed_steps_instruction = """
+        logger.debug("🔄 Optimized prompt: %.100s...", optimized_prompt)
+    
+    # Create the system prompt with Phase 2 optimizations
+    detailed_steps_instruction = ""
+    if req.detailed_steps:
+        detailed_steps_instruction = """
 SPECIAL FOCUS ON DETAILED MANUFACTURING STEPS:
 - Provide 6-7 highly detailed manufacturing steps
 - Each step should be comprehensive with specific instructions
@@ -307,8 +310,8 @@ SPECIAL FOCUS ON DETAILED MANUFACTURING STEPS:
 - Include detailed safety protocols for each step
 - Provide troubleshooting tips for common issues"""
 
-        if category == "pet food":
-            system_prompt = f"""You are an expert pet food formulator. Generate a detailed pet food formulation.
+    if category == "pet food":
+        system_prompt = f"""You are an expert pet food formulator. Generate a detailed pet food formulation.
 
 Guidelines:
 - Total ingredients should add up to 100%
@@ -325,8 +328,8 @@ Guidelines:
 - Include comprehensive scientific reasoning with key components, target audience analysis, and Indian market trends
 - Include detailed market research with TAM, SAM, and TM analysis using latest Indian market data
 {detailed_steps_instruction}"""
-        elif category == "wellness":
-            system_prompt = f"""You are an expert wellness supplement formulator. Generate a detailed supplement formulation.
+    elif category == "wellness":
+        system_prompt = f"""You are an expert wellness supplement formulator. Generate a detailed supplement formulation.
 
 Guidelines:
 - Total ingredients should add up to 100%
@@ -343,8 +346,8 @@ Guidelines:
 - Include comprehensive scientific reasoning with key components, target audience analysis, and Indian market trends
 - Include detailed market research with TAM, SAM, and TM analysis using latest Indian market data
 {detailed_steps_instruction}"""
-        elif category == "beverages":
-            system_prompt = f"""You are an expert beverage formulator. Generate a detailed beverage formulation.
+    elif category == "beverages":
+        system_prompt = f"""You are an expert beverage formulator. Generate a detailed beverage formulation.
 
 Guidelines:
 - Total ingredients should add up to 100%
@@ -361,8 +364,8 @@ Guidelines:
 - Include comprehensive scientific reasoning with key components, target audience analysis, and Indian market trends
 - Include detailed market research with TAM, SAM, and TM analysis using latest Indian market data
 {detailed_steps_instruction}"""
-        elif category == "textiles":
-            system_prompt = f"""You are an expert textile formulator and material scientist. Generate a detailed textile formulation.
+    elif category == "textiles":
+        system_prompt = f"""You are an expert textile formulator and material scientist. Generate a detailed textile formulation.
 
 Guidelines:
 - Total fiber composition should add up to 100%
@@ -379,8 +382,8 @@ Guidelines:
 - Include comprehensive scientific reasoning with key components, target audience analysis, and Indian market trends
 - Include detailed market research with TAM, SAM, and TM analysis using latest Indian market data
 {detailed_steps_instruction}"""
-        elif category == "desi masala":
-            system_prompt = f"""You are an expert Indian spice formulator and culinary scientist. Generate a detailed masala formulation.
+    elif category == "desi masala":
+        system_prompt = f"""You are an expert Indian spice formulator and culinary scientist. Generate a detailed masala formulation.
 
 Guidelines:
 - Total spice composition should add up to 100%
@@ -397,8 +400,8 @@ Guidelines:
 - Include comprehensive scientific reasoning with key components, target audience analysis, and Indian market trends
 - Include detailed market research with TAM, SAM, and TM analysis using latest Indian market data
 {detailed_steps_instruction}"""
-        else:
-            system_prompt = f"""You are an expert cosmetic formulator. Generate a detailed cosmetic formulation.
+    else:
+        system_prompt = f"""You are an expert cosmetic formulator. Generate a detailed cosmetic formulation.
 
 Guidelines:
 - Total ingredients should add up to 100%
@@ -416,9 +419,9 @@ Guidelines:
 - Include detailed market research with TAM, SAM, and TM analysis using latest Indian market data
 {detailed_steps_instruction}"""
 
-        detailed_steps_request = ""
-        if req.detailed_steps:
-            detailed_steps_request = """
+    detailed_steps_request = ""
+    if req.detailed_steps:
+        detailed_steps_request = """
         
         🎯 SPECIAL REQUEST - DETAILED MANUFACTURING STEPS:
         Please provide 6-7 extremely detailed manufacturing steps with:
@@ -429,8 +432,8 @@ Guidelines:
         - Troubleshooting tips for each critical step
         - Professional manufacturing guidance suitable for production teams
         """
-        
-        user_prompt = f"""
+    
+    user_prompt = f"""
         Create a formulation for: {optimized_prompt}
         Category: {req.category or 'General'}
         Target cost: {req.target_cost or 'Not specified'}
@@ -438,166 +441,234 @@ Guidelines:
         Please provide a complete, safe, and effective formulation with detailed ingredient rationales, local supplier information, and step-by-step manufacturing instructions.{detailed_steps_request}
         """
 
-        print(f"📤 Sending optimized request to OpenAI...")
-        print(f"📝 Optimized prompt: {user_prompt[:100]}...")
+    logger.info("📤 Sending optimized request to OpenAI...")
+    logger.debug("📝 Optimized prompt: %.100s...", user_prompt)
 
-        # Call OpenAI with function calling
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=4000,
-            tools=get_formulation_function_definitions(),
-            tool_choice={"type": "function", "function": {"name": "generate_formulation"}}
-        )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
 
-        # Parse the function call response
-        message = response.choices[0].message
-        print(f"📥 Received OpenAI response with function call")
-        
-        if message.tool_calls and len(message.tool_calls) > 0:
-            tool_call = message.tool_calls[0]
-            if tool_call.function.name == "generate_formulation":
-                try:
-                    data = json.loads(tool_call.function.arguments)
-                    print(f"✅ Function call parsed successfully")
-                    print(f"📊 Found {len(data.get('ingredients', []))} ingredients")
-                except json.JSONDecodeError as e:
-                    print(f"❌ Error parsing function call arguments: {e}")
-                    return _generate_mock_formulation(req)
-        else:
-            print("❌ No function call in response")
-            return _generate_mock_formulation(req)
-        
-        # Convert to IngredientDetail objects
-        ingredients = []
-        for ing_data in data.get('ingredients', []):
-            suppliers = []
-            for supplier_data in ing_data.get('suppliers', []):
-                # Calculate pricing per 100ml based on ingredient percentage and cost
-                ingredient_percent = float(ing_data.get('percent', 0))
-                ingredient_cost_per_100ml = float(ing_data.get('cost_per_100ml', 0))
-                price_per_100ml = (ingredient_cost_per_100ml * ingredient_percent / 100) if ingredient_percent > 0 else 0
-                
-                suppliers.append(SupplierInfo(
-                    name=supplier_data.get('name', 'Unknown Supplier'),
-                    contact=supplier_data.get('contact', 'Contact info not available'),
-                    location=supplier_data.get('location', 'Location not specified'),
-                    price_per_unit=float(supplier_data.get('price_per_unit', 0)),
-                    price_per_100ml=price_per_100ml
-                ))
+def _formulation_completion_kwargs(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Chat completion arguments shared by the sync and async OpenAI clients"""
+    return {
+        "model": "gpt-4",
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": 4000,
+        "tools": get_formulation_function_definitions(),
+        "tool_choice": {"type": "function", "function": {"name": "generate_formulation"}}
+    }
+
+def _build_formulation_response(req: GenerateRequest, category: str, message: Any) -> GenerateResponse:
+    """Turn the generate_formulation tool call into a GenerateResponse and cache it"""
+    logger.info("📥 Received OpenAI response with function call")
+    
+    if message.tool_calls and len(message.tool_calls) > 0:
+        tool_call = message.tool_calls[0]
+        if tool_call.function.name == "generate_formulation":
+            try:
+                data = json.loads(tool_call.function.arguments)
+                logger.info("✅ Function call parsed successfully")
+                logger.info("📊 Found %d ingredients", len(data.get('ingredients', [])))
+            except json.JSONDecodeError as e:
+                logger.error("❌ Error parsing function call arguments: %s", e)
+                raise FormulationUnavailableError("Unparseable generate_formulation arguments") from e
+    else:
+        logger.error("❌ No function call in response")
+        raise FormulationUnavailableError("No function call in response")
+    
+    # Convert to IngredientDetail objects
+    ingredients = []
+    for ing_data in data.get('ingredients', []):
+        suppliers = []
+        for supplier_data in ing_data.get('suppliers', []):
+            # Calculate pricing per 100ml based on ingredient percentage and cost
+            ingredient_percent = float(ing_data.get('percent', 0))
+            ingredient_cost_per_100ml = float(ing_data.get('cost_per_100ml', 0))
+            price_per_100ml = (ingredient_cost_per_100ml * ingredient_percent / 100) if ingredient_percent > 0 else 0
             
-            ingredients.append(IngredientDetail(
-                name=ing_data.get('name', 'Unknown'),
-                percent=float(ing_data.get('percent', 0)),
-                cost_per_100ml=float(ing_data.get('cost_per_100ml', 0)),
-                why_chosen=ing_data.get('why_chosen', 'No rationale provided'),
-                suppliers=suppliers
+            suppliers.append(SupplierInfo(
+                name=supplier_data.get('name', 'Unknown Supplier'),
+                contact=supplier_data.get('contact', 'Contact info not available'),
+                location=supplier_data.get('location', 'Location not specified'),
+                price_per_unit=float(supplier_data.get('price_per_unit', 0)),
+                price_per_100ml=price_per_100ml
             ))
         
-        # Convert manufacturing_steps to simple strings if they are objects
-        manufacturing_steps = data.get('manufacturing_steps', [])
-        if manufacturing_steps and isinstance(manufacturing_steps[0], dict):
-            # Convert complex objects to simple strings
-            converted_steps = []
-            for step in manufacturing_steps:
-                if isinstance(step, dict):
-                    # Format: "Step X: Title - How"
-                    step_num = step.get('step_number', '')
-                    title = step.get('title', '')
-                    how = step.get('how', '')
-                    step_str = f"Step {step_num}: {title}"
-                    if how:
-                        step_str += f" - {how}"
-                    converted_steps.append(step_str)
-                else:
-                    converted_steps.append(str(step))
-            manufacturing_steps = converted_steps
-        
-        # Get scientific reasoning from OpenAI response or use scientific reasoning service
-        scientific_reasoning = data.get('scientific_reasoning')
-        
-        # Check if the scientific reasoning is comprehensive (has our expected format)
-        if not scientific_reasoning or not _is_comprehensive_scientific_reasoning(scientific_reasoning):
-            # Use the scientific reasoning service to get real OpenAI data
-            try:
-                scientific_reasoning_service = ScientificReasoningService()
-                scientific_reasoning_request = ScientificReasoningRequest(
-                    category=req.category,
-                    product_description=req.prompt,
-                    target_concerns=None
-                )
-                scientific_reasoning_response = scientific_reasoning_service.generate_scientific_reasoning(scientific_reasoning_request)
-                scientific_reasoning = {
-                    "keyComponents": [{"name": comp.name, "why": comp.why} for comp in scientific_reasoning_response.keyComponents],
-                    "impliedDesire": scientific_reasoning_response.impliedDesire,
-                    "psychologicalDrivers": scientific_reasoning_response.psychologicalDrivers,
-                    "valueProposition": scientific_reasoning_response.valueProposition,
-                    "targetAudience": scientific_reasoning_response.targetAudience,
-                    "indiaTrends": scientific_reasoning_response.indiaTrends,
-                    "regulatoryStandards": scientific_reasoning_response.regulatoryStandards,
-                    "demographicBreakdown": scientific_reasoning_response.demographic_breakdown.dict() if scientific_reasoning_response.demographic_breakdown else None,
-                    "psychographicProfile": scientific_reasoning_response.psychographic_profile.dict() if scientific_reasoning_response.psychographic_profile else None,
-                    "marketOpportunitySummary": scientific_reasoning_response.market_opportunity_summary
-                }
-            except Exception as e:
-                print(f"❌ Scientific reasoning service error: {e}")
-                # Fallback to mock data if scientific reasoning service fails
-                scientific_reasoning = _generate_scientific_reasoning(req.category or 'cosmetics', req.prompt)
-        
-        # Get market research from OpenAI response or use mock data
-        market_research = data.get('market_research')
-        
-        # Check if market research is comprehensive (has our expected format)
-        if not market_research or not _is_comprehensive_market_research(market_research):
-            # Use enhanced mock market research if OpenAI didn't provide comprehensive data
-            market_research = _generate_market_research(req.category or 'cosmetics', req.prompt)
-        else:
-            # Ensure detailed calculations are always included, even if OpenAI provided market research
-            if not market_research.get('detailed_calculations'):
-                # Get the detailed calculations from our function and merge them
-                detailed_calculations = _generate_market_research(req.category or 'cosmetics', req.prompt).get('detailed_calculations', {})
-                market_research['detailed_calculations'] = detailed_calculations
-        
-        # Create the response
-        response_data = GenerateResponse(
-            product_name=data.get('product_name', 'Generated Product'),
-            reasoning=data.get('reasoning', 'No reasoning provided'),
-            ingredients=ingredients,
-            manufacturing_steps=manufacturing_steps,
-            estimated_cost=float(data.get('estimated_cost', 0)),
-            safety_notes=data.get('safety_notes', []),
-            packaging_marketing_inspiration=data.get('packaging_marketing_inspiration', 'No packaging inspiration provided'),
-            market_trends=data.get('market_trends', []),
-            competitive_landscape=data.get('competitive_landscape', {}),
-            scientific_reasoning=scientific_reasoning,
-            market_research=market_research
-        )
-        
-        # Phase 2: Cache the response (synchronous)
-        try:
-            cache_formulation_sync(req.prompt, response_data.dict(), {"category": category})
-            print("✅ Response cached successfully")
-        except Exception as e:
-            print(f"⚠️ Caching failed: {e}")
-        
-        # Phase 2: Apply response compression
+        ingredients.append(IngredientDetail(
+            name=ing_data.get('name', 'Unknown'),
+            percent=float(ing_data.get('percent', 0)),
+            cost_per_100ml=float(ing_data.get('cost_per_100ml', 0)),
+            why_chosen=ing_data.get('why_chosen', 'No rationale provided'),
+            suppliers=suppliers
+        ))
+    
+    # Convert manufacturing_steps to simple strings if they are objects
+    manufacturing_steps = data.get('manufacturing_steps', [])
+    if manufacturing_steps and isinstance(manufacturing_steps[0], dict):
+        # Convert complex objects to simple strings
+        converted_steps = []
+        for step in manufacturing_steps:
+            if isinstance(step, dict):
+                # Format: "Step X: Title - How"
+                step_num = step.get('step_number', '')
+                title = step.get('title', '')
+                how = step.get('how', '')
+                step_str = f"Step {step_num}: {title}"
+                if how:
+                    step_str += f" - {how}"
+                converted_steps.append(step_str)
+            else:
+                converted_steps.append(str(step))
+        manufacturing_steps = converted_steps
+    
+    # Get scientific reasoning from OpenAI response or use scientific reasoning service
+    scientific_reasoning = data.get('scientific_reasoning')
+    
+    # Check if the scientific reasoning is comprehensive (has our expected format)
+    if not scientific_reasoning or not _is_comprehensive_scientific_reasoning(scientific_reasoning):
+        # Use the scientific reasoning service to get real OpenAI data
         try:
-            compressed_response, compression_stats = compress_api_response(response_data.dict(), CompressionLevel.MEDIUM)
-            print(f"✅ Response compressed: {compression_stats.reduction_percentage:.1f}% reduction")
+            scientific_reasoning_service = _scientific_reasoning_service()
+            scientific_reasoning_request = ScientificReasoningRequest(
+                category=req.category,
+                product_description=req.prompt,
+                target_concerns=None
+            )
+            scientific_reasoning_response = scientific_reasoning_service.generate_scientific_reasoning(scientific_reasoning_request)
+            scientific_reasoning = {
+                "keyComponents": [{"name": comp.name, "why": comp.why} for comp in scientific_reasoning_response.keyComponents],
+                "impliedDesire": scientific_reasoning_response.impliedDesire,
+                "psychologicalDrivers": scientific_reasoning_response.psychologicalDrivers,
+                "valueProposition": scientific_reasoning_response.valueProposition,
+                "targetAudience": scientific_reasoning_response.targetAudience,
+                "indiaTrends": scientific_reasoning_response.indiaTrends,
+                "regulatoryStandards": scientific_reasoning_response.regulatoryStandards,
+                "demographicBreakdown": scientific_reasoning_response.demographic_breakdown.dict() if scientific_reasoning_response.demographic_breakdown else None,
+                "psychographicProfile": scientific_reasoning_response.psychographic_profile.dict() if scientific_reasoning_response.psychographic_profile else None,
+                "marketOpportunitySummary": scientific_reasoning_response.market_opportunity_summary
+            }
         except Exception as e:
-            print(f"⚠️ Compression failed: {e}")
-            compressed_response = response_data.dict()
+            logger.error("❌ Scientific reasoning service error: %s", e)
+            # Fallback to mock data if scientific reasoning service fails
+            scientific_reasoning = _generate_scientific_reasoning(req.category or 'cosmetics', req.prompt)
+    
+    # Get market research from OpenAI response or use mock data
+    market_research = data.get('market_research')
+    
+    # Check if market research is comprehensive (has our expected format)
+    if not market_research or not _is_comprehensive_market_research(market_research):
+        # Use enhanced mock market research if OpenAI didn't provide comprehensive data
+        market_research = _generate_market_research(req.category or 'cosmetics', req.prompt)
+    else:
+        # Ensure detailed calculations are always included, even if OpenAI provided market research
+        if not market_research.get('detailed_calculations'):
+            # Get the detailed calculations from our function and merge them
+            detailed_calculations = _generate_market_research(req.category or 'cosmetics', req.prompt).get('detailed_calculations', {})
+            market_research['detailed_calculations'] = detailed_calculations
+    
+    # Create the response
+    response_data = GenerateResponse(
+        product_name=data.get('product_name', 'Generated Product'),
+        reasoning=data.get('reasoning', 'No reasoning provided'),
+        ingredients=ingredients,
+        manufacturing_steps=manufacturing_steps,
+        estimated_cost=float(data.get('estimated_cost', 0)),
+        safety_notes=data.get('safety_notes', []),
+        packaging_marketing_inspiration=data.get('packaging_marketing_inspiration', 'No packaging inspiration provided'),
+        market_trends=data.get('market_trends', []),
+        competitive_landscape=data.get('competitive_landscape', {}),
+        scientific_reasoning=scientific_reasoning,
+        market_research=market_research
+    )
+    
+    # Phase 2: Cache the response (synchronous)
+    try:
+        cache_formulation_sync(req.prompt, response_data.dict(), {"category": category})
+        logger.info("✅ Response cached successfully")
+    except Exception as e:
+        logger.warning("⚠️ Caching failed: %s", e)
+    
+    # Phase 2: Apply response compression
+    try:
+        compressed_response, compression_stats = compress_api_response(response_data.dict(), CompressionLevel.MEDIUM)
+        logger.info("✅ Response compressed: %.1f%% reduction", compression_stats.reduction_percentage)
+    except Exception as e:
+        logger.warning("⚠️ Compression failed: %s", e)
+        compressed_response = response_data.dict()
+    
+    return response_data
+
+def generate_formulation(req: GenerateRequest) -> GenerateResponse:
+    """
+    Use OpenAI to generate a real formulation based on the request with Phase 2 optimizations.
+    """
+    logger.info("🔍 Starting formulation generation for: %s", req.prompt)
+    category = (req.category or '').lower()
+    
+    cached_response = _lookup_cached_formulation(req, category)
+    if cached_response:
+        return cached_response
+    
+    # Check if OpenAI client is available
+    if not client:
+        logger.info("🔄 Using fallback mock formulation (OpenAI not available)")
+        return _generate_mock_formulation(req)
+    
+    logger.info("✅ OpenAI client is available, proceeding with API call")
+    
+    try:
+        messages = _build_formulation_messages(req, category)
         
-        return response_data
+        # Call OpenAI with function calling
+        response = create_chat_completion(client, **_formulation_completion_kwargs(messages))
+        return _build_formulation_response(req, category, response.choices[0].message)
         
     except Exception as e:
-        print(f"❌ Error in formulation generation: {e}")
+        logger.error("❌ Error in formulation generation: %s", e)
         return _generate_mock_formulation(req)
 
+async def generate_real_formulation_async(req: GenerateRequest) -> GenerateResponse:
+    """
+    Async-native generate_formulation: the OpenAI round-trip is awaited on AsyncOpenAI, so
+    no thread is held while the model runs. Only the blocking cache lookup and the response
+    assembly (which may call the sync scientific reasoning service) are handed to threads.
+    
+    Unlike generate_formulation_async this never substitutes the sample formulation: it
+    raises when no real one can be produced, so callers can keep fallbacks out of caches.
+    """
+    logger.info("🔍 Starting formulation generation for: %s", req.prompt)
+    category = (req.category or '').lower()
+    
+    cached_response = await asyncio.to_thread(_lookup_cached_formulation, req, category)
+    if cached_response:
+        return cached_response
+    
+    # Check if OpenAI client is available
+    if not async_api_key:
+        raise FormulationUnavailableError("OpenAI not available")
+    
+    messages = _build_formulation_messages(req, category)
+    
+    # Call OpenAI with function calling
+    response = await acreate_chat_completion(get_async_openai_client(async_api_key), **_formulation_completion_kwargs(messages))
+    return await asyncio.to_thread(_build_formulation_response, req, category, response.choices[0].message)
+
+async def generate_formulation_async(req: GenerateRequest) -> GenerateResponse:
+    """
+    generate_real_formulation_async, falling back to the sample formulation on any failure
+    """
+    try:
+        return await generate_real_formulation_async(req)
+    except Exception as e:
+        logger.error("❌ Error in formulation generation: %s", e)
+        return _generate_mock_formulation(req)
+
+def generate_fallback_formulation(req: GenerateRequest) -> GenerateResponse:
+    """Sample formulation served when a real one cannot be generated; cheap and never calls OpenAI"""
+    return _generate_mock_formulation(req)
+
 def _is_comprehensive_scientific_reasoning(scientific_reasoning: dict) -> bool:
     """
     Check if the scientific reasoning data is comprehensive (has our expected format).
@@ -1465,33 +1536,133 @@ def _generate_market_research(category: str, prompt: str) -> dict:
             }
         }
 
+# Sample formulation contents per category, so the fallback never offers e.g. cosmetic
+# actives as pet food. Ingredients are (name, percent, cost per 100, why chosen, supplier, location)
+_SAMPLE_FORMULATIONS = {
+    "cosmetics": {
+        "ingredients": (
+            ("Purified Water", 70.0, 0.5, "Base solvent that carries the active ingredients", "AquaPure Industries", "Mumbai"),
+            ("Glycerin", 10.0, 8.0, "Humectant that draws moisture and improves texture", "Godrej Industries", "Mumbai"),
+            ("Niacinamide", 5.0, 120.0, "Multi-functional active supporting barrier repair and even tone", "Vizag Chemicals", "Visakhapatnam"),
+            ("Hyaluronic Acid", 2.0, 250.0, "Long-lasting hydration across skin layers", "Bloomage India", "Bengaluru"),
+            ("Aloe Vera Extract", 12.0, 15.0, "Soothing botanical that supports skin comfort", "Herbal Extracts Co.", "Jaipur"),
+            ("Phenoxyethanol", 1.0, 40.0, "Broad-spectrum preservative for shelf stability", "Galaxy Surfactants", "Navi Mumbai"),
+        ),
+        "manufacturing_steps": (
+            "Step 1: Sanitize equipment and weigh all ingredients",
+            "Step 2: Heat the water phase and dissolve water-soluble ingredients",
+            "Step 3: Cool below 40°C and add heat-sensitive actives",
+            "Step 4: Add preservative, adjust pH and mix until uniform",
+            "Step 5: Run quality checks and fill into packaging",
+        ),
+        "safety_notes": ("Patch test before use", "Sample formulation for development only"),
+        "packaging_marketing_inspiration": "Minimal, clean packaging highlighting the key actives",
+        "market_trends": ("Clean beauty", "Ingredient transparency"),
+    },
+    "pet food": {
+        "ingredients": (
+            ("Chicken Meal", 30.0, 25.0, "Concentrated animal protein with essential amino acids for muscle maintenance", "Venky's Feeds", "Pune"),
+            ("Brown Rice", 25.0, 6.0, "Digestible carbohydrate for steady energy", "Punjab Grains Co.", "Ludhiana"),
+            ("Peas", 20.0, 7.0, "Plant protein and fibre", "Agro Pulses Ltd", "Indore"),
+            ("Sweet Potato", 15.0, 8.0, "Complex carbohydrates and fibre for digestive health", "Fresh Harvest Foods", "Nashik"),
+            ("Fish Oil", 5.0, 60.0, "Omega-3 fatty acids for coat and joint health", "Coastal Marine Oils", "Mangaluru"),
+            ("Vitamin & Mineral Premix", 4.5, 150.0, "Completes the daily micronutrient profile", "NutriBlend India", "Hyderabad"),
+            ("Mixed Tocopherols", 0.5, 200.0, "Natural antioxidant that keeps the fats fresh", "Vitae Naturals", "Chennai"),
+        ),
+        "manufacturing_steps": (
+            "Step 1: Inspect, weigh and grind the dry ingredients",
+            "Step 2: Mix the dry ingredients with the vitamin and mineral premix",
+            "Step 3: Extrude and cook the mix into kibble",
+            "Step 4: Dry and cool the kibble, then coat with fish oil and tocopherols",
+            "Step 5: Run quality checks and pack in sealed, food-grade bags",
+        ),
+        "safety_notes": ("Transition pets to the new food gradually over 7 days", "Sample formulation for development only"),
+        "packaging_marketing_inspiration": "Resealable bags showing the protein source and feeding guide",
+        "market_trends": ("Pet humanization", "High-protein, grain-conscious recipes"),
+    },
+    "wellness": {
+        "ingredients": (
+            ("Whey Protein Isolate", 40.0, 90.0, "Complete protein for daily nutrition and recovery", "Prolicious Nutrition", "Ahmedabad"),
+            ("Oat Fibre", 25.0, 12.0, "Soluble fibre supporting digestion and satiety", "Grain Health Foods", "Delhi"),
+            ("Natural Cocoa Powder", 18.0, 35.0, "Flavour and antioxidant polyphenols", "Coastal Cocoa Co.", "Kochi"),
+            ("Magnesium Citrate", 8.0, 40.0, "Well-absorbed magnesium for muscle and nerve function", "Mineral Sciences India", "Vadodara"),
+            ("Ashwagandha Root Extract", 5.0, 300.0, "Traditional adaptogen for stress support", "Herbal Extracts Co.", "Jaipur"),
+            ("Vitamin C (Ascorbic Acid)", 2.0, 80.0, "Antioxidant vitamin supporting immunity", "Vizag Chemicals", "Visakhapatnam"),
+            ("Stevia Leaf Extract", 2.0, 150.0, "Zero-calorie natural sweetener", "Sweet Leaf Agro", "Bengaluru"),
+        ),
+        "manufacturing_steps": (
+            "Step 1: Verify raw material certificates and weigh all ingredients",
+            "Step 2: Sieve and pre-blend the minor ingredients",
+            "Step 3: Blend with the protein and fibre until uniform",
+            "Step 4: Test the blend for assay, moisture and microbial limits",
+            "Step 5: Fill into moisture-proof containers and seal",
+        ),
+        "safety_notes": ("Consult a doctor before use if pregnant, nursing or on medication", "Sample formulation for development only"),
+        "packaging_marketing_inspiration": "Clean tubs with clear per-serving nutrition and sourcing information",
+        "market_trends": ("Preventive health", "Plant-based and adaptogenic ingredients"),
+    },
+    "general": {
+        "ingredients": (
+            ("Purified Water", 86.0, 0.5, "Base solvent for the formulation", "AquaPure Industries", "Mumbai"),
+            ("Glycerin", 10.0, 8.0, "Humectant that improves texture and stability", "Godrej Industries", "Mumbai"),
+            ("Xanthan Gum", 2.0, 45.0, "Natural thickener that keeps the product uniform", "Fine Gums India", "Ahmedabad"),
+            ("Citric Acid", 1.0, 20.0, "Adjusts pH for stability", "Vizag Chemicals", "Visakhapatnam"),
+            ("Potassium Sorbate", 1.0, 35.0, "Preservative for shelf stability", "Galaxy Surfactants", "Navi Mumbai"),
+        ),
+        "manufacturing_steps": (
+            "Step 1: Sanitize equipment and weigh all ingredients",
+            "Step 2: Disperse the thickener in water with glycerin",
+            "Step 3: Add the remaining ingredients and mix until uniform",
+            "Step 4: Adjust pH and run quality checks",
+            "Step 5: Fill into packaging",
+        ),
+        "safety_notes": ("Sample formulation for development only",),
+        "packaging_marketing_inspiration": "Simple, informative packaging listing every ingredient",
+        "market_trends": ("Ingredient transparency", "Sustainable packaging"),
+    },
+}
+
 def _generate_mock_formulation(req: GenerateRequest) -> GenerateResponse:
-    """Generate a mock formulation when OpenAI is unavailable"""
+    """Generate a mock formulation when OpenAI is unavailable; static data, no network calls"""
     
     category = req.category or "cosmetics"
     
-    # Use scientific reasoning service for real data
-    try:
-        scientific_reasoning_service = ScientificReasoningService()
-        scientific_reasoning_request = ScientificReasoningRequest(
-            category=req.category,
-            product_description=req.prompt,
-            target_concerns=None
+    # Static reasoning only: this runs after generation failed or timed out, so it must
+    # not start another (unbounded) OpenAI round-trip
+    scientific_reasoning = _generate_scientific_reasoning(category, req.prompt)
+    market_research = _generate_market_research(category, req.prompt)
+    sample = _SAMPLE_FORMULATIONS.get(category.lower(), _SAMPLE_FORMULATIONS["general"])
+    
+    # Build the flat GenerateResponse directly; no intermediate wrapper model
+    ingredients = [
+        IngredientDetail(
+            name=name,
+            percent=percent,
+            cost_per_100ml=cost,
+            why_chosen=why,
+            suppliers=[
+                SupplierInfo(
+                    name=supplier,
+                    contact="Contact info not available",
+                    location=location,
+                    price_per_unit=cost,
+                    price_per_100ml=cost * percent / 100
+                )
+            ]
         )
-        scientific_reasoning_response = scientific_reasoning_service.generate_scientific_reasoning(scientific_reasoning_request)
-        scientific_reasoning = {
-            "keyComponents": [{"name": comp.name, "why": comp.why} for comp in scientific_reasoning_response.keyComponents],
-            "impliedDesire": scientific_reasoning_response.impliedDesire,
-            "psychologicalDrivers": scientific_reasoning_response.psychologicalDrivers,
-            "valueProposition": scientific_reasoning_response.valueProposition,
-            "targetAudience": scientific_reasoning_response.targetAudience,
-            "indiaTrends": scientific_reasoning_response.indiaTrends,
-            "regulatoryStandards": scientific_reasoning_response.regulatoryStandards,
-            "demographicBreakdown": scientific_reasoning_response.demographic_breakdown.dict() if scientific_reasoning_response.demographic_breakdown else None,
-            "psychographicProfile": scientific_reasoning_response.psychographic_profile.dict() if scientific_reasoning_response.psychographic_profile else None,
-            "marketOpportunitySummary": scientific_reasoning_response.market_opportunity_summary
-        }
-    except Exception as e:
-        print(f"❌ Scientific reasoning service error in mock: {e}")
-        # Fallback to hardcoded data
-        scientific_reasoning = _generate_scientific_reasoning(category, req.prompt)
+        for name, percent, cost, why, supplier, location in sample["ingredients"]
+    ]
+    
+    return GenerateResponse(
+        product_name=f"Sample {category.title()} Formulation",
+        reasoning="Sample formulation generated without the OpenAI service. Each ingredient is chosen for a clear functional role; see the per-ingredient notes.",
+        ingredients=ingredients,
+        manufacturing_steps=list(sample["manufacturing_steps"]),
+        estimated_cost=round(sum(i.cost_per_100ml * i.percent / 100 for i in ingredients), 2),
+        safety_notes=list(sample["safety_notes"]),
+        packaging_marketing_inspiration=sample["packaging_marketing_inspiration"],
+        market_trends=list(sample["market_trends"]),
+        competitive_landscape={},
+        scientific_reasoning=scientific_reasoning,
+        market_research=market_research
+    )
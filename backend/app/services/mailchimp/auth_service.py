@@ -2,6 +2,7 @@ import hashlib
 import httpx
 from typing import Optional
 from app.core.config import settings
+from app.core.http import get_http_client
 
 class MailchimpAuthService:
     def __init__(self):
@@ -37,34 +38,34 @@ class MailchimpAuthService:
         subscriber_hash = self._get_subscriber_hash(email)
         url = f"{self.base_url}/lists/{self.list_id}/members/{subscriber_hash}"
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    url,
-                    headers=self._get_auth_header(),
-                    timeout=30.0
-                )
+        client = get_http_client()
+        try:
+            response = await client.get(
+                url,
+                headers=self._get_auth_header(),
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("status") == "subscribed"
+            elif response.status_code == 404:
+                # Member not found
+                return False
+            else:
+                # Other error
+                response.raise_for_status()
+                return False  # This line should never be reached due to raise_for_status()
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("status") == "subscribed"
-                elif response.status_code == 404:
-                    # Member not found
-                    return False
-                else:
-                    # Other error
-                    response.raise_for_status()
-                    return False  # This line should never be reached due to raise_for_status()
-                    
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    # Member not found
-                    return False
-                else:
-                    # Re-raise other HTTP errors
-                    raise e
-            except Exception as e:
-                raise Exception(f"Failed to check subscription status: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                # Member not found
+                return False
+            else:
+                # Re-raise other HTTP errors
+                raise e
+        except Exception as e:
+            raise Exception(f"Failed to check subscription status: {str(e)}")
 
 # Create a singleton instance
 auth_service = MailchimpAuthService() 
\ No newline at end of file
@@ -1,14 +1,106 @@
-import openai
 import json
 from typing import Dict, Any
 from app.core.config import settings
+from app.services.openai_client import create_chat_completion, get_openai_client
+from app.services.cache_service import get_cached_market_research_sync, cache_market_research_sync, normalize_prompt
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Static instructions and function schema lead every request, with the product
+# details last, so OpenAI's automatic prompt caching can reuse the prefix
+_MARKET_SIZE_SYSTEM_PROMPT = """You are a senior market research analyst specializing in the Indian market and in product-specific market analysis. Calculate precise market sizes for specific product formulations based on their unique characteristics.
+
+For the product the user describes, provide a PRECISE calculation for that EXACT formulation:
+- Current market size in Indian Rupees
+- Growth rate for this specific segment
+- Market drivers and competitive landscape
+- Pricing analysis and distribution channels
+- Methodology and confidence level
+- Product segment and ingredient premium factor
+- Unique selling points based on ingredient combination
+
+Be extremely specific to the product's unique characteristics."""
+
+_MARKET_SIZE_FUNCTIONS = [
+    {
+        "name": "analyze_product_specific_market_size",
+        "description": "Calculate market size for specific product formulation",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "current_market_size": {
+                    "type": "string",
+                    "description": "Current annual market size for THIS specific product in Indian Rupees (e.g., '₹45 Crore')"
+                },
+                "growth_rate": {
+                    "type": "string", 
+                    "description": "Growth rate for THIS specific product segment (e.g., '18.5%')"
+                },
+                "market_drivers": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Specific drivers for THIS product's market growth"
+                },
+                "competitive_landscape": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Direct competitors for THIS specific product formulation"
+                },
+                "pricing_analysis": {
+                    "type": "object",
+                    "properties": {
+                        "average_price_range": {"type": "string"},
+                        "premium_segment_percentage": {"type": "string"},
+                        "price_drivers": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["average_price_range", "premium_segment_percentage", "price_drivers"]
+                },
+                "distribution_channels": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optimal distribution channels for THIS specific product"
+                },
+                "methodology": {
+                    "type": "string",
+                    "description": "Detailed methodology for calculating THIS product's market size"
+                },
+                "data_sources": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Data sources used for THIS product analysis"
+                },
+                "confidence_level": {
+                    "type": "string",
+                    "description": "Confidence level in THIS product's market analysis"
+                },
+                "product_segment": {
+                    "type": "string",
+                    "description": "The market segment this product belongs to"
+                },
+                "ingredient_premium_factor": {
+                    "type": "string",
+                    "description": "How premium ingredients affect market positioning"
+                },
+                "unique_selling_points": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Unique selling points based on ingredient combination"
+                }
+            },
+            "required": [
+                "current_market_size", "growth_rate", "market_drivers", 
+                "competitive_landscape", "pricing_analysis", "distribution_channels",
+                "methodology", "data_sources", "confidence_level", "product_segment",
+                "ingredient_premium_factor", "unique_selling_points"
+            ]
+        }
+    }
+]
+
 class MarketResearchService:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        self.client = get_openai_client(settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
     
     def get_current_market_size(self, product_name: str, category: str, ingredients: list) -> Dict[str, Any]:
         """
@@ -16,7 +108,14 @@ class MarketResearchService:
         """
         try:
             if self.client:
-                return self._fetch_from_openai(product_name, category, ingredients)
+                # Re-analyses of the same product (retries, shared links) are served from Redis
+                cache_context = {"category": normalize_prompt(category), "ingredients": ingredients}
+                cached = get_cached_market_research_sync(product_name, cache_context)
+                if cached:
+                    return cached
+                market_data = self._fetch_from_openai(product_name, category, ingredients)
+                cache_market_research_sync(product_name, market_data, cache_context)
+                return market_data
             else:
                 return self._get_fallback_market_size(product_name, category, ingredients)
         except Exception as e:
@@ -71,113 +170,24 @@ class MarketResearchService:
         complexity_factor = len(ingredients) * 0.1 + positioning_score * 0.2
         
         # Create sophisticated prompt for product-specific analysis
-        prompt = f"""
-        You are a senior market research analyst specializing in the Indian market. 
-        
-        Analyze the CURRENT market size for this SPECIFIC product formulation:
-        
-        PRODUCT: {product_name}
-        CATEGORY: {category}
-        SEGMENT: {market_segment}
-        COMPLEXITY: {complexity_factor:.1f}/10
-        
-        INGREDIENTS: {ingredients_desc}
-        
-        Provide PRECISE calculation for this EXACT product formulation:
-        - Current market size in Indian Rupees
-        - Growth rate for this specific segment
-        - Market drivers and competitive landscape
-        - Pricing analysis and distribution channels
-        - Methodology and confidence level
-        - Product segment and ingredient premium factor
-        - Unique selling points based on ingredient combination
-        
-        Be extremely specific to this product's unique characteristics.
-        """
-        
-        functions = [
-            {
-                "name": "analyze_product_specific_market_size",
-                "description": "Calculate market size for specific product formulation",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "current_market_size": {
-                            "type": "string",
-                            "description": "Current annual market size for THIS specific product in Indian Rupees (e.g., '₹45 Crore')"
-                        },
-                        "growth_rate": {
-                            "type": "string", 
-                            "description": "Growth rate for THIS specific product segment (e.g., '18.5%')"
-                        },
-                        "market_drivers": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Specific drivers for THIS product's market growth"
-                        },
-                        "competitive_landscape": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Direct competitors for THIS specific product formulation"
-                        },
-                        "pricing_analysis": {
-                            "type": "object",
-                            "properties": {
-                                "average_price_range": {"type": "string"},
-                                "premium_segment_percentage": {"type": "string"},
-                                "price_drivers": {"type": "array", "items": {"type": "string"}}
-                            },
-                            "required": ["average_price_range", "premium_segment_percentage", "price_drivers"]
-                        },
-                        "distribution_channels": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optimal distribution channels for THIS specific product"
-                        },
-                        "methodology": {
-                            "type": "string",
-                            "description": "Detailed methodology for calculating THIS product's market size"
-                        },
-                        "data_sources": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Data sources used for THIS product analysis"
-                        },
-                        "confidence_level": {
-                            "type": "string",
-                            "description": "Confidence level in THIS product's market analysis"
-                        },
-                        "product_segment": {
-                            "type": "string",
-                            "description": "The market segment this product belongs to"
-                        },
-                        "ingredient_premium_factor": {
-                            "type": "string",
-                            "description": "How premium ingredients affect market positioning"
-                        },
-                        "unique_selling_points": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Unique selling points based on ingredient combination"
-                        }
-                    },
-                    "required": [
-                        "current_market_size", "growth_rate", "market_drivers", 
-                        "competitive_landscape", "pricing_analysis", "distribution_channels",
-                        "methodology", "data_sources", "confidence_level", "product_segment",
-                        "ingredient_premium_factor", "unique_selling_points"
-                    ]
-                }
-            }
-        ]
+        # Only the product details vary; the instructions live in the static system prompt
+        prompt = f"""Analyze the CURRENT market size for this SPECIFIC product formulation:
+
+PRODUCT: {product_name}
+CATEGORY: {category}
+SEGMENT: {market_segment}
+COMPLEXITY: {complexity_factor:.1f}/10
+
+INGREDIENTS: {ingredients_desc}"""
         
-        response = self.client.chat.completions.create(
+        response = create_chat_completion(
+            self.client,
             model="gpt-4",
             messages=[
-                {"role": "system", "content": "You are a senior market research analyst specializing in product-specific market analysis. Calculate precise market sizes for specific product formulations based on their unique characteristics."},
+                {"role": "system", "content": _MARKET_SIZE_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            functions=functions,
+            functions=_MARKET_SIZE_FUNCTIONS,
             function_call={"name": "analyze_product_specific_market_size"},
             temperature=0.2,
             max_tokens=2500
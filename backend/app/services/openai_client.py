@@ -0,0 +1,65 @@
+"""
+Shared OpenAI clients and concurrency gate for outbound chat completions.
+
+Every service gets its client from these factories, so the whole process shares
+one connection pool per client type instead of one per service, and routes its
+completion calls through these helpers so a burst of requests queues locally
+instead of tripping the provider's rate limits. The OpenAI SDK already retries
+429s with jittered exponential backoff.
+"""
+
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app.core.config import settings
+from app.core.http import get_http_client
+
+# Long completions (the 4000-token formulation) legitimately take minutes, so the async
+# client sets its own deadline rather than inheriting the shared pool's
+_LLM_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+
+@lru_cache(maxsize=None)
+def get_openai_client(api_key: str) -> OpenAI:
+    """Process-wide sync client for an API key"""
+    return OpenAI(api_key=api_key)
+
+@lru_cache(maxsize=None)
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """Process-wide async client for an API key, on the shared pooled httpx client"""
+    return AsyncOpenAI(api_key=api_key, http_client=get_http_client(), timeout=_LLM_TIMEOUT)
+
+def _split_llm_budget(total: int, thread_share: Optional[int] = None) -> Tuple[int, int]:
+    """
+    (async slots, thread slots) for a total concurrency budget.
+    
+    The sync services (which run in worker threads) and the async endpoints carry
+    comparable traffic, so by default each gets half. Each side keeps at least one
+    slot, so the two only sum to `total` when it is at least 2.
+    """
+    thread_slots = total // 2 if thread_share is None else thread_share
+    thread_slots = max(1, min(thread_slots, total - 1))
+    return max(1, total - thread_slots), thread_slots
+
+# One LLM_MAX_CONCURRENCY budget, split so the two gates together never exceed it
+_LLM_ASYNC_SLOTS, _LLM_THREAD_SLOTS = _split_llm_budget(settings.LLM_MAX_CONCURRENCY, settings.LLM_THREAD_CONCURRENCY)
+
+# Caps in-flight completions from async endpoints
+llm_semaphore = asyncio.Semaphore(_LLM_ASYNC_SLOTS)
+
+# Caps in-flight completions from the sync services
+_llm_thread_semaphore = threading.BoundedSemaphore(_LLM_THREAD_SLOTS)
+
+async def acreate_chat_completion(client: Any, **kwargs: Any) -> Any:
+    """Await client.chat.completions.create under the shared semaphore"""
+    async with llm_semaphore:
+        return await client.chat.completions.create(**kwargs)
+
+def create_chat_completion(client: Any, **kwargs: Any) -> Any:
+    """Call client.chat.completions.create under the shared thread semaphore"""
+    with _llm_thread_semaphore:
+        return client.chat.completions.create(**kwargs)
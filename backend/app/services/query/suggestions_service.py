@@ -1,26 +1,28 @@
 import os
 import json
-from dotenv import load_dotenv
+import logging
 from typing import List, Optional
-from openai import OpenAI
+from app.services.openai_client import create_chat_completion, get_openai_client
 from app.models.query import SuggestionRequest, SuggestionResponse, Suggestion, RecommendedSuggestion
+from app.services.cache_service import get_cached_suggestions_sync, cache_suggestions_sync, normalize_prompt
+from app.core.config import load_env
 
-# Load environment variables from the root .env file
-# Navigate from backend/app/services/query/ to project root
-project_root = os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')
-load_dotenv(os.path.join(project_root, '.env'))
+# Load environment variables from the .env files (once per process)
+load_env()
+
+logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client only if API key is available
 client = None
 try:
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key and api_key != "your_openai_api_key_here" and api_key.strip():
-        client = OpenAI(api_key=api_key)
-        print("✅ OpenAI client initialized successfully")
+        client = get_openai_client(api_key)
+        logger.info("✅ OpenAI client initialized successfully")
     else:
-        print("⚠️ OpenAI API key not found or invalid, will use fallback mock data")
+        logger.warning("⚠️ OpenAI API key not found or invalid, will use fallback mock data")
 except Exception as e:
-    print(f"⚠️ Failed to initialize OpenAI client: {e}")
+    logger.warning("⚠️ Failed to initialize OpenAI client: %s", e)
 
 from app.models.query import SuggestionRequest, SuggestionResponse, Suggestion
 
@@ -93,7 +95,8 @@ def extract_product_info(user_prompt: str, category: Optional[str] = None) -> di
         if not client:
             return {"product_type": "<product>", "form": "<form>", "concern": "<concern>"}
         
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            client,
             model="gpt-4",
             messages=[{"role": "user", "content": extraction_prompt}],
             temperature=0,
@@ -113,7 +116,7 @@ def extract_product_info(user_prompt: str, category: Optional[str] = None) -> di
         
         return {"product_type": "<product>", "form": "<form>", "concern": "<concern>"}
     except Exception as e:
-        print("extract_product_info error:", e)
+        logger.warning("extract_product_info error: %s", e)
         return {"product_type": "<product>", "form": "<form>", "concern": "<concern>"}
 
 def get_suggestion_prompt(info, request):
@@ -280,7 +283,8 @@ def score_all_suggestions(suggestions: List[Suggestion], category: str, original
     scoring_prompt = get_scoring_prompt(suggestions, category, original_query)
     
     try:
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            client,
             model="gpt-4",
             messages=[{"role": "user", "content": scoring_prompt}],
             temperature=0,
@@ -323,7 +327,7 @@ def score_all_suggestions(suggestions: List[Suggestion], category: str, original
         
         return generate_mock_scored_suggestions(suggestions, category)
     except Exception as e:
-        print("score_all_suggestions error:", e)
+        logger.warning("score_all_suggestions error: %s", e)
         return generate_mock_scored_suggestions(suggestions, category)
 
 def generate_recommendation(suggestions: List[Suggestion], category: str, user_prompt: str) -> Optional[RecommendedSuggestion]:
@@ -388,11 +392,18 @@ def generate_suggestions(request: SuggestionRequest) -> SuggestionResponse:
     if not client:
         return generate_mock_suggestions(request)
     
+    # Repeat prompts (ignoring case and spacing) skip all three LLM round-trips
+    cache_context = {"category": normalize_prompt(request.category)}
+    cached = get_cached_suggestions_sync(request.prompt, cache_context)
+    if cached:
+        return SuggestionResponse.model_validate(cached)
+    
     info = extract_product_info(request.prompt, request.category)
     suggestion_prompt = get_suggestion_prompt(info, request)
     
     try:
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            client,
             model="gpt-4",
             messages=[{"role": "user", "content": suggestion_prompt}],
             temperature=0,
@@ -420,7 +431,7 @@ def generate_suggestions(request: SuggestionRequest) -> SuggestionResponse:
                             if prompt and why and how:  # Only add if all fields have content
                                 suggestions.append(Suggestion(prompt=prompt, why=why, how=how))
                         except Exception as e:
-                            print(f"Error processing suggestion: {e}")
+                            logger.warning("Error processing suggestion: %s", e)
                             continue
                     
                     # If no valid suggestions were created, use fallback
@@ -433,7 +444,7 @@ def generate_suggestions(request: SuggestionRequest) -> SuggestionResponse:
                         try:
                             scored_suggestions = score_all_suggestions(suggestions, request.category or "general", request.prompt)
                         except Exception as score_error:
-                            print(f"Scoring generation error: {score_error}")
+                            logger.warning("Scoring generation error: %s", score_error)
                     
                     # Generate recommendation
                     recommendation = None
@@ -441,20 +452,22 @@ def generate_suggestions(request: SuggestionRequest) -> SuggestionResponse:
                         try:
                             recommendation = generate_recommendation(scored_suggestions, request.category or "general", request.prompt)
                         except Exception as rec_error:
-                            print(f"Recommendation generation error: {rec_error}")
+                            logger.warning("Recommendation generation error: %s", rec_error)
                     
-                    return SuggestionResponse(
+                    result = SuggestionResponse(
                         suggestions=scored_suggestions, 
                         recommended_suggestion=recommendation,
                         success=True, 
                         message="Enriched suggestions generated with scores and recommendation"
                     )
+                    cache_suggestions_sync(request.prompt, result.model_dump(), cache_context)
+                    return result
                 except json.JSONDecodeError:
                     return generate_mock_suggestions(request)
         
         return generate_mock_suggestions(request)
     except Exception as e:
-        print("generate_suggestions error:", e)
+        logger.error("generate_suggestions error: %s", e)
         return generate_mock_suggestions(request)
 
 def generate_mock_scored_suggestions(suggestions: List[Suggestion], category: str) -> List[Suggestion]:
@@ -620,7 +633,7 @@ def generate_mock_suggestions(request: SuggestionRequest) -> SuggestionResponse:
         try:
             recommendation = generate_recommendation(scored_suggestions, category, request.prompt)
         except Exception as rec_error:
-            print(f"Mock recommendation generation error: {rec_error}")
+            logger.warning("Mock recommendation generation error: %s", rec_error)
     
     return SuggestionResponse(
         suggestions=scored_suggestions,
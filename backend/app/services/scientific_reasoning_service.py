@@ -1,20 +1,143 @@
-import openai
 import json
 from typing import List, Dict, Any
 from app.models.scientific_reasoning import ScientificReasoningRequest, ScientificReasoningResponse, KeyComponent
 from app.core.config import settings
+from app.services.openai_client import create_chat_completion, acreate_chat_completion, get_openai_client, get_async_openai_client
+from app.services.cache_service import get_cached_scientific_reasoning, cache_scientific_reasoning, normalize_prompt
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Static instructions and function schema lead every request, with the product
+# description last, so OpenAI's automatic prompt caching can reuse the prefix
+_SCIENTIFIC_REASONING_SYSTEM_PROMPT = """You are a senior cosmetic chemist and market research analyst specializing in the Indian beauty market. Provide detailed, scientifically accurate, and market-relevant information.
+
+For the product the user describes, generate detailed, realistic, and scientifically accurate information:
+
+1. KEY COMPONENTS: List 4-6 key ingredients with scientific names and detailed reasoning
+2. IMPLIED DESIRE: Primary consumer desire this formulation addresses
+3. PSYCHOLOGICAL DRIVERS: 3-4 consumer psychology factors
+4. VALUE PROPOSITION: 3-4 unique selling points and competitive advantages
+5. TARGET AUDIENCE: Detailed demographic and psychographic description
+6. DEMOGRAPHIC BREAKDOWN: Age range, income level, lifestyle, purchase behavior
+7. PSYCHOGRAPHIC PROFILE: Values, preferences, and motivations
+8. INDIA TRENDS: 3-4 current market trends in India
+9. REGULATORY STANDARDS: 3-4 Indian regulatory and health claims standards
+10. MARKET OPPORTUNITY SUMMARY: Comprehensive market analysis including market potential, competitive landscape, strategic recommendations, target segment analysis, pricing strategy, distribution channels, risk factors, growth projections, and innovation opportunities
+
+Focus on scientific accuracy, Indian market relevance, current trends, and regulatory compliance."""
+
+_SCIENTIFIC_REASONING_FUNCTIONS = [
+    {
+        "name": "generate_scientific_reasoning",
+        "description": "Generate comprehensive scientific reasoning data for cosmetic formulations",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "keyComponents": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string", "description": "Scientific name of the ingredient"},
+                            "why": {"type": "string", "description": "Detailed reasoning for why this ingredient was chosen"}
+                        },
+                        "required": ["name", "why"]
+                    },
+                    "description": "List of key ingredients with scientific reasoning"
+                },
+                "impliedDesire": {
+                    "type": "string",
+                    "description": "Primary consumer desire this formulation addresses"
+                },
+                "psychologicalDrivers": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Consumer psychology factors influencing this product"
+                },
+                "valueProposition": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Unique selling points and competitive advantages"
+                },
+                "targetAudience": {
+                    "type": "string",
+                    "description": "Detailed demographic and psychographic description"
+                },
+                "indiaTrends": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Current market trends in India relevant to this formulation"
+                },
+                "regulatoryStandards": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Indian regulatory and health claims standards"
+                },
+                "demographicBreakdown": {
+                    "type": "object",
+                    "properties": {
+                        "age_range": {"type": "string", "description": "Specific age range of target audience"},
+                        "income_level": {"type": "string", "description": "Income level of target audience"},
+                        "lifestyle": {"type": "string", "description": "Lifestyle characteristics of target audience"},
+                        "purchase_behavior": {"type": "string", "description": "Purchase behavior patterns of target audience"}
+                    },
+                    "required": ["age_range", "income_level", "lifestyle", "purchase_behavior"],
+                    "description": "Detailed demographic breakdown of target audience"
+                },
+                "psychographicProfile": {
+                    "type": "object",
+                    "properties": {
+                        "values": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Core values that drive consumer behavior"
+                        },
+                        "preferences": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Product and brand preferences of target audience"
+                        },
+                        "motivations": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Key motivations for purchasing this product"
+                        }
+                    },
+                    "required": ["values", "preferences", "motivations"],
+                    "description": "Detailed psychographic profile of target audience"
+                },
+                "marketOpportunitySummary": {
+                    "type": "string",
+                    "description": "Comprehensive market opportunity analysis including market potential, competitive landscape, strategic recommendations, target segment analysis, pricing strategy, distribution channels, risk factors, growth projections, and innovation opportunities"
+                }
+            },
+            "required": [
+                "keyComponents", "impliedDesire", "psychologicalDrivers", 
+                "valueProposition", "targetAudience", "indiaTrends", "regulatoryStandards",
+                "demographicBreakdown", "psychographicProfile", "marketOpportunitySummary"
+            ]
+        }
+    }
+]
+
 class ScientificReasoningService:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client(settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+    
+    @property
+    def async_client(self):
+        # Looked up per call rather than kept on the instance: shutdown closes the HTTP pool
+        # the cached client rides on, and the next lookup builds a fresh one
+        return get_async_openai_client(settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
     
     def generate_scientific_reasoning(self, request: ScientificReasoningRequest) -> ScientificReasoningResponse:
         """Generate comprehensive scientific reasoning data using OpenAI"""
         
         try:
+            if not self.client:
+                raise RuntimeError("OpenAI API key not configured")
+            
             # Create a detailed prompt for scientific reasoning
             prompt = self._create_scientific_reasoning_prompt(request)
             
@@ -31,144 +154,75 @@ class ScientificReasoningService:
             # Return fallback data if OpenAI fails
             return self._get_fallback_data(request)
     
+    async def agenerate_scientific_reasoning(self, request: ScientificReasoningRequest) -> ScientificReasoningResponse:
+        """Async variant of generate_scientific_reasoning using AsyncOpenAI"""
+        
+        try:
+            if not self.async_client:
+                raise RuntimeError("OpenAI API key not configured")
+            
+            # Identical requests (ignoring case and spacing) are served from Redis
+            cache_context = self._cache_context(request)
+            cached = await get_cached_scientific_reasoning(request.product_description, cache_context)
+            if cached:
+                return ScientificReasoningResponse.model_validate(cached)
+            
+            prompt = self._create_scientific_reasoning_prompt(request)
+            
+            response = await acreate_chat_completion(self.async_client, **self._completion_kwargs(prompt))
+            
+            scientific_data = self._parse_scientific_response(self._function_arguments(response))
+            
+            result = ScientificReasoningResponse(**scientific_data)
+            # Only real model output is cached, never the fallback data
+            await cache_scientific_reasoning(request.product_description, result.model_dump(), cache_context)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error generating scientific reasoning: {e}")
+            # Return fallback data if OpenAI fails
+            return self._get_fallback_data(request)
+    
+    def _cache_context(self, request: ScientificReasoningRequest) -> Dict[str, Any]:
+        """Normalized request fields, besides the description, that key the response cache"""
+        return {
+            "category": normalize_prompt(request.category),
+            "target_concerns": sorted(normalize_prompt(c) for c in request.target_concerns or []),
+        }
+    
     def _create_scientific_reasoning_prompt(self, request: ScientificReasoningRequest) -> str:
         """Create a comprehensive prompt for scientific reasoning generation"""
         
         category = request.category or "cosmetic formulation"
         product_desc = request.product_description or f"a {category}"
         
-        prompt = f"""
-        You are a senior cosmetic chemist and market research analyst specializing in the Indian beauty market. 
-        Create comprehensive scientific reasoning analysis for: {product_desc}
-        
-        Generate detailed, realistic, and scientifically accurate information:
-        
-        1. KEY COMPONENTS: List 4-6 key ingredients with scientific names and detailed reasoning
-        2. IMPLIED DESIRE: Primary consumer desire this formulation addresses
-        3. PSYCHOLOGICAL DRIVERS: 3-4 consumer psychology factors
-        4. VALUE PROPOSITION: 3-4 unique selling points and competitive advantages
-        5. TARGET AUDIENCE: Detailed demographic and psychographic description
-        6. DEMOGRAPHIC BREAKDOWN: Age range, income level, lifestyle, purchase behavior
-        7. PSYCHOGRAPHIC PROFILE: Values, preferences, and motivations
-        8. INDIA TRENDS: 3-4 current market trends in India
-        9. REGULATORY STANDARDS: 3-4 Indian regulatory and health claims standards
-        10. MARKET OPPORTUNITY SUMMARY: Comprehensive market analysis including market potential, competitive landscape, strategic recommendations, target segment analysis, pricing strategy, distribution channels, risk factors, growth projections, and innovation opportunities
-        
-        Focus on scientific accuracy, Indian market relevance, current trends, and regulatory compliance.
-        """
-        
-        return prompt
+        # Only the product varies; the instructions live in the static system prompt
+        return f"Create comprehensive scientific reasoning analysis for: {product_desc}"
     
     def _call_openai_with_functions(self, prompt: str) -> Dict[str, Any]:
         """Call OpenAI with function calling for structured output"""
         
-        functions = [
-            {
-                "name": "generate_scientific_reasoning",
-                "description": "Generate comprehensive scientific reasoning data for cosmetic formulations",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "keyComponents": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "name": {"type": "string", "description": "Scientific name of the ingredient"},
-                                    "why": {"type": "string", "description": "Detailed reasoning for why this ingredient was chosen"}
-                                },
-                                "required": ["name", "why"]
-                            },
-                            "description": "List of key ingredients with scientific reasoning"
-                        },
-                        "impliedDesire": {
-                            "type": "string",
-                            "description": "Primary consumer desire this formulation addresses"
-                        },
-                        "psychologicalDrivers": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Consumer psychology factors influencing this product"
-                        },
-                        "valueProposition": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Unique selling points and competitive advantages"
-                        },
-                        "targetAudience": {
-                            "type": "string",
-                            "description": "Detailed demographic and psychographic description"
-                        },
-                        "indiaTrends": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Current market trends in India relevant to this formulation"
-                        },
-                        "regulatoryStandards": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Indian regulatory and health claims standards"
-                        },
-                        "demographicBreakdown": {
-                            "type": "object",
-                            "properties": {
-                                "age_range": {"type": "string", "description": "Specific age range of target audience"},
-                                "income_level": {"type": "string", "description": "Income level of target audience"},
-                                "lifestyle": {"type": "string", "description": "Lifestyle characteristics of target audience"},
-                                "purchase_behavior": {"type": "string", "description": "Purchase behavior patterns of target audience"}
-                            },
-                            "required": ["age_range", "income_level", "lifestyle", "purchase_behavior"],
-                            "description": "Detailed demographic breakdown of target audience"
-                        },
-                        "psychographicProfile": {
-                            "type": "object",
-                            "properties": {
-                                "values": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "Core values that drive consumer behavior"
-                                },
-                                "preferences": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "Product and brand preferences of target audience"
-                                },
-                                "motivations": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "Key motivations for purchasing this product"
-                                }
-                            },
-                            "required": ["values", "preferences", "motivations"],
-                            "description": "Detailed psychographic profile of target audience"
-                        },
-                        "marketOpportunitySummary": {
-                            "type": "string",
-                            "description": "Comprehensive market opportunity analysis including market potential, competitive landscape, strategic recommendations, target segment analysis, pricing strategy, distribution channels, risk factors, growth projections, and innovation opportunities"
-                        }
-                    },
-                    "required": [
-                        "keyComponents", "impliedDesire", "psychologicalDrivers", 
-                        "valueProposition", "targetAudience", "indiaTrends", "regulatoryStandards",
-                        "demographicBreakdown", "psychographicProfile", "marketOpportunitySummary"
-                    ]
-                }
-            }
-        ]
+        response = create_chat_completion(self.client, **self._completion_kwargs(prompt))
+        return self._function_arguments(response)
+    
+    def _completion_kwargs(self, prompt: str) -> Dict[str, Any]:
+        """Chat completion arguments shared by the sync and async clients"""
         
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a senior cosmetic chemist and market research analyst specializing in the Indian beauty market. Provide detailed, scientifically accurate, and market-relevant information."},
+        return {
+            "model": "gpt-4",
+            "messages": [
+                {"role": "system", "content": _SCIENTIFIC_REASONING_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            functions=functions,
-            function_call={"name": "generate_scientific_reasoning"},
-            temperature=0.7,
-            max_tokens=2000
-        )
+            "functions": _SCIENTIFIC_REASONING_FUNCTIONS,
+            "function_call": {"name": "generate_scientific_reasoning"},
+            "temperature": 0.7,
+            "max_tokens": 2000
+        }
+    
+    def _function_arguments(self, response: Any) -> Dict[str, Any]:
+        """Extract the function call arguments from a chat completion"""
         
-        # Extract function call arguments
         function_call = response.choices[0].message.function_call
         if function_call and function_call.arguments:
             return json.loads(function_call.arguments)
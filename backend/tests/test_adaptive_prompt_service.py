@@ -0,0 +1,37 @@
+from app.services import adaptive_prompt_service as prompt_module
+from app.services.adaptive_prompt_service import AdaptivePromptService, OptimizationLevel, PromptContext, PromptType
+
+
+def test_optimize_prompt_memo_hit_and_miss():
+    service = AdaptivePromptService(OptimizationLevel.AGGRESSIVE)
+    context = PromptContext(query="serum", product_type="serum", requirements=["vitamin C", "niacinamide"])
+
+    first = service.optimize_prompt(PromptType.FORMULATION, context)
+    # An equal context is a hit and returns the memoized prompt
+    again = service.optimize_prompt(PromptType.FORMULATION, PromptContext(query="other", product_type="serum", requirements=("vitamin C", "niacinamide")))
+    assert again is first
+    # A different product type, prompt type or level is a miss
+    assert service.optimize_prompt(PromptType.FORMULATION, PromptContext(query="serum", product_type="cream")) is not first
+    assert service.optimize_prompt(PromptType.BRANDING, context) is not first
+    assert AdaptivePromptService(OptimizationLevel.LIGHT).optimize_prompt(PromptType.FORMULATION, context).prompt != first.prompt
+    # Usage is tracked on hits as well as misses
+    assert service.usage_patterns["formulation_serum"] == 2
+
+    assert first.optimization_techniques == ("template_optimization", "context_filling", "redundant_word_removal", "phrase_shortening")
+    assert isinstance(first.optimization_techniques, tuple)
+
+
+def test_optimize_prompt_memo_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(prompt_module, "_PROMPT_CACHE_MAXSIZE", 2)
+    service = AdaptivePromptService()
+    serum, cream, gel = (PromptContext(query=name, product_type=name) for name in ("serum", "cream", "gel"))
+
+    first_serum = service.optimize_prompt(PromptType.FORMULATION, serum)
+    first_cream = service.optimize_prompt(PromptType.FORMULATION, cream)
+    # Touching the serum entry makes cream the least recently used one
+    assert service.optimize_prompt(PromptType.FORMULATION, serum) is first_serum
+    service.optimize_prompt(PromptType.FORMULATION, gel)
+
+    assert service.optimize_prompt(PromptType.FORMULATION, serum) is first_serum
+    assert service.optimize_prompt(PromptType.FORMULATION, cream) is not first_cream
+
@@ -0,0 +1,357 @@
+import asyncio
+import threading
+import time
+from fnmatch import fnmatchcase
+
+import zstandard
+
+from app.services import cache_service as cache_module
+
+
+def _as_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakeRedisServer:
+    """In-memory keyspace shared by the fake sync and async clients"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        entry = self.data.get(_as_bytes(key))
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[_as_bytes(key)]
+            return None
+        return value
+
+    def pttl(self, key):
+        if self.get(key) is None:
+            return -2
+        expires_at = self.data[_as_bytes(key)][1]
+        return -1 if expires_at is None else int((expires_at - time.monotonic()) * 1000)
+
+    def set(self, key, value, ttl=None):
+        self.data[_as_bytes(key)] = (_as_bytes(value), time.monotonic() + int(ttl) if ttl is not None else None)
+        return True
+
+    def unlink(self, key):
+        return 1 if self.data.pop(_as_bytes(key), None) is not None else 0
+
+    def scan(self, match):
+        return [key for key in list(self.data) if fnmatchcase(key, _as_bytes(match))]
+
+    def msetex(self, keys, args):
+        for i, key in enumerate(keys):
+            self.set(key, args[i * 2 + 1], args[i * 2])
+        return len(keys)
+
+
+class FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append((self.server.get, key))
+        return self
+
+    def pttl(self, key):
+        self.commands.append((self.server.pttl, key))
+        return self
+
+    def unlink(self, key):
+        self.commands.append((self.server.unlink, key))
+        return self
+
+    def __len__(self):
+        return len(self.commands)
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return [command(key) for command, key in commands]
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self):
+        return FakePipeline.execute(self)
+
+
+class FakeRedis:
+    def __init__(self, server):
+        self.server = server
+        self.requested = []
+
+    def get(self, key):
+        self.requested.append(_as_bytes(key))
+        return self.server.get(key)
+
+    def set(self, key, value):
+        return self.server.set(key, value)
+
+    def execute_command(self, command, *args):
+        assert command == "SETEX"
+        key, ttl, value = args
+        return self.server.set(key, value, ttl)
+
+    def register_script(self, script):
+        return lambda keys, args: self.server.msetex(keys, args)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.server)
+
+    def scan_iter(self, match, count=None):
+        return iter(self.server.scan(match))
+
+
+class FakeAsyncRedis:
+    def __init__(self, server):
+        self.server = server
+        self.requested = []
+
+    async def get(self, key):
+        self.requested.append(_as_bytes(key))
+        return self.server.get(key)
+
+    def register_script(self, script):
+        async def run(keys, args):
+            return self.server.msetex(keys, args)
+        return run
+
+    def pipeline(self, transaction=True):
+        return FakeAsyncPipeline(self.server)
+
+    async def scan_iter(self, match, count=None):
+        for key in self.server.scan(match):
+            yield key
+
+
+def make_service(monkeypatch, server):
+    monkeypatch.setattr(cache_module.redis, "from_url", lambda *args, **kwargs: FakeRedis(server))
+    monkeypatch.setattr(cache_module.aioredis, "from_url", lambda *args, **kwargs: FakeAsyncRedis(server))
+    return cache_module.AdvancedCacheService()
+
+
+def make_formulation(i):
+    return {
+        "product_name": f"Hydrating Serum {i}",
+        "ingredients": [
+            {"name": "Niacinamide", "percent": 5 + i % 3, "why_chosen": "Brightens and evens skin tone"},
+            {"name": "Hyaluronic Acid", "percent": 1 + i % 2, "why_chosen": "Draws moisture into the skin"},
+            {"name": "Panthenol", "percent": 2, "why_chosen": "Soothes and supports the barrier"},
+        ],
+        "manufacturing_steps": ["Heat water phase to 75C", "Add actives below 40C", f"Adjust pH to 5.{i % 10}"],
+    }
+
+
+def train_dictionary(service, data_type):
+    samples = [cache_module.orjson.dumps(make_formulation(i)) for i in range(cache_module._ZDICT_SAMPLES)]
+    service.zstd_dictionaries._train(data_type, samples)
+    return service.zstd_dictionaries._by_type[data_type]
+
+
+def stored_value(service, server, data_type, query, context=None):
+    """Raw bytes the service wrote to Redis for an entry"""
+    return server.get(service.get_cache_key(data_type, service.get_query_hash(query, context)))
+
+
+def test_set_get_round_trip_without_dictionary(monkeypatch):
+    server = FakeRedisServer()
+    writer = make_service(monkeypatch, server)
+    small = {"name": "Serum"}
+    large = make_formulation(1)
+    assert writer.set("formulation", "small serum", small)
+    assert writer.set("formulation", "large serum", large)
+    assert writer.set("suggestions", "large serum", large)
+    writer.flush_writes()
+
+    # Small values and types without compression stay plain JSON; the rest are zstd frames
+    assert stored_value(writer, server, "formulation", "small serum") == cache_module.orjson.dumps(small)
+    assert stored_value(writer, server, "suggestions", "large serum") == cache_module.orjson.dumps(large)
+    frame = stored_value(writer, server, "formulation", "large serum")
+    assert frame[:1] == cache_module._ZSTD_MAGIC
+    assert zstandard.get_frame_parameters(frame[1:]).dict_id == 0
+
+    # A fresh service (no local copies) reads every entry back from Redis
+    reader = make_service(monkeypatch, server)
+    assert reader.get("formulation", "small serum") == small
+    assert reader.get("formulation", "large serum") == large
+    assert reader.get("suggestions", "large serum") == large
+    assert reader.get_stats()["hits"] == 3
+
+
+def test_set_get_round_trip_with_dictionary(monkeypatch):
+    server = FakeRedisServer()
+    writer = make_service(monkeypatch, server)
+    dict_data = train_dictionary(writer, "formulation")
+    assert writer.set("formulation", "serum 7", make_formulation(7))
+    writer.flush_writes()
+    frame = stored_value(writer, server, "formulation", "serum 7")
+    assert zstandard.get_frame_parameters(frame[1:]).dict_id == dict_data.dict_id()
+
+    # Another worker resolves the dictionary from Redis by the id in the frame
+    reader = make_service(monkeypatch, server)
+    assert reader.get("formulation", "serum 7") == make_formulation(7)
+
+
+def test_mset_mget_round_trip(monkeypatch):
+    server = FakeRedisServer()
+    writer = make_service(monkeypatch, server)
+    train_dictionary(writer, "formulation")
+    entries = [("formulation", f"serum {i}", make_formulation(i), None) for i in range(3)]
+    entries.append(("suggestions", "serum", {"suggestions": ["a", "b"]}, {"page": 1}))
+    assert writer.mset(entries)
+    frame = stored_value(writer, server, "formulation", "serum 0")
+    assert zstandard.get_frame_parameters(frame[1:]).dict_id == writer.zstd_dictionaries._by_type["formulation"].dict_id()
+
+    reader = make_service(monkeypatch, server)
+    lookups = [(data_type, query, context) for data_type, query, _, context in entries]
+    lookups.append(("formulation", "never cached", None))
+    assert reader.mget(lookups) == [data for _, _, data, _ in entries] + [None]
+    assert reader.get_stats()["hits"] == 4 and reader.get_stats()["misses"] == 1
+
+
+def test_async_paths_never_load_dictionaries_through_the_sync_client(monkeypatch):
+    server = FakeRedisServer()
+    train_dictionary(make_service(monkeypatch, server), "formulation")
+    service = make_service(monkeypatch, server)
+    entries = [("formulation", f"cream {i}", make_formulation(i), None) for i in range(3)]
+
+    async def round_trip():
+        assert await service.amset(entries)
+        reader = make_service(monkeypatch, server)
+        values = await reader.amget([(data_type, query, context) for data_type, query, _, context in entries])
+        single = await reader.aget("formulation", "cream 0")
+        return reader, values, single
+
+    reader, values, single = asyncio.run(round_trip())
+    assert values == [data for _, _, data, _ in entries]
+    assert single == make_formulation(0)
+    for client in (service.redis_client, reader.redis_client):
+        assert not [key for key in client.requested if key.startswith(cache_module._ZDICT_PREFIX.encode())]
+    assert any(key.startswith(cache_module._ZDICT_PREFIX.encode()) for key in reader.async_redis_client.requested)
+
+
+def test_invalidate_pattern_only_drops_matching_type(monkeypatch):
+    server = FakeRedisServer()
+    service = make_service(monkeypatch, server)
+    assert service.mset([
+        ("formulation", "serum", make_formulation(1), None),
+        ("branding", "serum", {"brand": "Glow"}, None),
+    ])
+
+    assert service.invalidate_pattern("formulation") == 1
+    assert service.get("formulation", "serum") is None
+    assert service.get("branding", "serum") == {"brand": "Glow"}
+
+    assert asyncio.run(service.ainvalidate_pattern("branding")) == 1
+    assert service.get("branding", "serum") is None
+    assert server.data == {}
+
+
+def test_local_hits_return_independent_copies(monkeypatch):
+    service = make_service(monkeypatch, FakeRedisServer())
+    data = make_formulation(2)
+    assert service.mset([("formulation", "serum", data, None)])
+    data["product_name"] = "mutated after caching"
+
+    first = service.get("formulation", "serum")
+    first["ingredients"].clear()
+    second = service.get("formulation", "serum")
+    assert second == make_formulation(2)
+    assert second is not first
+
+
+def test_mset_replaces_and_failed_mset_evicts_local_entries(monkeypatch):
+    server = FakeRedisServer()
+    service = make_service(monkeypatch, server)
+    assert service.mset([("branding", "serum", {"brand": "Old"}, None)])
+    assert asyncio.run(service.amset([("branding", "serum", {"brand": "New"}, None)]))
+    assert service.get("branding", "serum") == {"brand": "New"}
+
+    def fail(keys, args):
+        raise ConnectionError("redis down")
+
+    # Another worker overwrites the entry; the local copy is now stale
+    make_service(monkeypatch, server).mset([("branding", "serum", {"brand": "Other"}, None)])
+    service._msetex = fail
+    assert not service.mset([("branding", "serum", {"brand": "Lost"}, None)])
+    # The local copy is gone, so the read falls through to what Redis actually holds
+    assert service.get("branding", "serum") == {"brand": "Other"}
+
+
+def hold_writes(service):
+    """Make the write-behind thread wait on the returned event before each SETEX"""
+    gate = threading.Event()
+    setex = service._setex
+
+    def held_setex(*args):
+        assert gate.wait(5)
+        return setex(*args)
+
+    service._setex = held_setex
+    return gate
+
+
+def test_invalidate_waits_for_queued_writes(monkeypatch):
+    server = FakeRedisServer()
+    service = make_service(monkeypatch, server)
+    gate = hold_writes(service)
+    assert service.set("formulation", "serum", make_formulation(3))
+
+    deleted = []
+    invalidation = threading.Thread(target=lambda: deleted.append(service.invalidate_pattern("formulation")))
+    invalidation.start()
+    invalidation.join(0.1)
+    assert invalidation.is_alive()
+    gate.set()
+    invalidation.join(5)
+
+    # The queued write landed first and was then removed, rather than surviving the UNLINK
+    assert deleted == [1]
+    assert server.data == {}
+    assert service.get("formulation", "serum") is None
+
+
+def test_async_invalidate_waits_for_queued_writes(monkeypatch):
+    server = FakeRedisServer()
+    service = make_service(monkeypatch, server)
+    gate = hold_writes(service)
+
+    async def set_then_invalidate():
+        assert await service.aset("branding", "serum", {"brand": "Glow"})
+        invalidation = asyncio.ensure_future(service.ainvalidate_pattern("branding"))
+        await asyncio.sleep(0.1)
+        assert not invalidation.done()
+        gate.set()
+        return await invalidation
+
+    assert asyncio.run(set_then_invalidate()) == 1
+    assert server.data == {}
+    assert service.get("branding", "serum") is None
+
+
+def test_failed_queued_write_is_counted_and_evicted(monkeypatch):
+    server = FakeRedisServer()
+    service = make_service(monkeypatch, server)
+
+    def fail(*args):
+        raise ConnectionError("redis down")
+
+    service._setex = fail
+    assert service.set("branding", "serum", {"brand": "Glow"})
+    service.flush_writes()
+
+    assert service.get_stats()["write_errors"] == 1
+    assert service.get("branding", "serum") is None
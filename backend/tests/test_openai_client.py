@@ -0,0 +1,24 @@
+from app.core.config import settings
+from app.services.openai_client import _LLM_ASYNC_SLOTS, _LLM_THREAD_SLOTS, _split_llm_budget, get_async_openai_client
+
+
+def test_async_client_sets_its_own_llm_timeout():
+    get_async_openai_client.cache_clear()
+    try:
+        client = get_async_openai_client("sk-test")
+        # Not the shared HTTP pool's deadline: long completions must not be cut off and retried
+        assert client.timeout.read == 120.0
+        assert client.timeout.connect == 5.0
+    finally:
+        get_async_openai_client.cache_clear()
+
+
+def test_llm_budget_is_split_between_async_and_thread_gates():
+    assert _split_llm_budget(8) == (4, 4)
+    assert _split_llm_budget(9) == (5, 4)
+    assert _split_llm_budget(8, thread_share=3) == (5, 3)
+    # Each gate keeps at least one slot
+    assert _split_llm_budget(8, thread_share=20) == (1, 7)
+    assert _split_llm_budget(2) == (1, 1)
+    # Together the two gates never exceed the configured total
+    assert _LLM_ASYNC_SLOTS + _LLM_THREAD_SLOTS == max(2, settings.LLM_MAX_CONCURRENCY)
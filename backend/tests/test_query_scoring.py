@@ -0,0 +1,35 @@
+import pytest
+
+from app.routers.query import assess_query_quality_simple
+
+
+def reference_score(query):
+    """Score as computed by the original substring-matching implementation"""
+    query_lower = query.lower()
+    score = 3
+    if len(query.split()) > 10:
+        score += 1
+    if any(word in query_lower for word in ['serum', 'cream', 'gel', 'lotion', 'moisturizer']):
+        score += 1
+    if any(word in query_lower for word in ['skin', 'face', 'body', 'hair']):
+        score += 1
+    if any(word in query_lower for word in ['acne', 'aging', 'hydration', 'brightening', 'anti-aging']):
+        score += 1
+    return score
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "moisturizer",
+    "serum for acne-prone skin",
+    "Serums and creams for skincare",
+    "An anti-aging night cream for mature, dry skin with retinol and hyaluronic acid",
+    "Brightening face gel",
+    "I need a lightweight serum for oily, acne-prone skin that contains salicylic acid and niacinamide",
+    "hydrating body lotion",
+    "Hair oil",
+    "something for my angel's chair",
+    "ANTI-AGING EYE CREAM",
+])
+def test_scores_match_substring_matching(query):
+    assert assess_query_quality_simple(query)["score"] == reference_score(query)